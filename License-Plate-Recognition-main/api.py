@@ -1,96 +1,288 @@
-from flask import Flask, request, jsonify
-import cv2
-import torch
+from flask import Flask, Request, Response, request, jsonify, stream_with_context
+from werkzeug.exceptions import RequestEntityTooLarge
+import io
+import json
 import os
-import tempfile
 import time
 import function.helper as helper
-import function.utils_rotate as utils_rotate
-from werkzeug.utils import secure_filename
+import function.image_io as image_io
+import function.model_registry as model_registry
+from function.admission import AdmissionQueue, Overloaded
+from function.result_cache import ResultCache, content_hash
+
+class InMemoryRequest(Request):
+    # Keep multipart uploads in memory instead of spooling large files to a temp file
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        return io.BytesIO()
 
 app = Flask(__name__)
+app.request_class = InMemoryRequest
+
+# Uploads are held in memory, so cap them: one image for /recognize, the whole body for any request
+MAX_UPLOAD_BYTES = int(float(os.getenv('MAX_UPLOAD_MB', 16)) * 1024 ** 2)
+app.config['MAX_CONTENT_LENGTH'] = int(float(os.getenv('MAX_REQUEST_MB', 256)) * 1024 ** 2)
 
 # Load YOLO models
 try:
-    yolo_LP_detect = torch.hub.load('yolov5', 'custom', path='model/LP_detector.pt', force_reload=True, source='local')
-    yolo_license_plate = torch.hub.load('yolov5', 'custom', path='model/LP_ocr.pt', force_reload=True, source='local')
-    yolo_license_plate.conf = 0.60
+    yolo_LP_detect = model_registry.get_model('model/LP_detector.pt')
+    yolo_license_plate = model_registry.get_model('model/LP_ocr.pt', conf=0.60)
     print("Models loaded successfully")
 except Exception as e:
     print(f"Error loading models: {e}")
 
+BATCH_SIZE = 8  # images per detector/OCR batch in /recognize/batch
+
+# Admission control: interactive requests (gate check-in/out) run before bulk ones (batch, reprocessing),
+# each class has a bounded queue and a default deadline, requests that cannot make it get 503 + Retry-After
+PRIORITIES = ('interactive', 'bulk')
+DEADLINES = {
+    'interactive': float(os.getenv('DEADLINE_INTERACTIVE_MS', 2000)) / 1000,
+    'bulk': float(os.getenv('DEADLINE_BULK_MS', 30000)) / 1000
+}
+admission = AdmissionQueue({
+    'interactive': int(os.getenv('QUEUE_INTERACTIVE', 8)),
+    'bulk': int(os.getenv('QUEUE_BULK', 32))
+}, concurrency=int(os.getenv('INFERENCE_CONCURRENCY', 1)))
+
+# /recognize results by hash of the upload bytes (retries, resubmitted snapshots), and optionally
+# OCR readings by perceptual hash of each detected plate crop (the same plate in a re-encoded or
+# repeated frame of a parked car skips OCR, the detector still runs).
+# Perceptual keys are never whole frames: from a fixed gate camera two different vehicles can give
+# near-identical frame hashes. A crop hash can still collide for plates differing in one faint
+# character, so RESULT_CACHE_PERCEPTUAL=1 trades that small risk within the TTL for fewer OCR calls
+RESULT_CACHE_TTL = float(os.getenv('RESULT_CACHE_TTL', 60))
+result_cache = ResultCache(int(os.getenv('RESULT_CACHE_SIZE', 1024)), RESULT_CACHE_TTL)
+plate_cache = ResultCache(int(os.getenv('RESULT_CACHE_SIZE', 1024)), RESULT_CACHE_TTL) \
+    if os.getenv('RESULT_CACHE_PERCEPTUAL') == '1' else None
+
+def read_crops(crops, plate_cache=None):
+    # OCR crops in one batched call, (plate, score) per crop; with a plate cache, crops whose
+    # perceptual hash was read recently reuse that reading and only the rest are OCR'd
+    if plate_cache is None:
+        return helper.read_plates(yolo_license_plate, crops)
+    keys = [image_io.perceptual_hash(crop) if crop.size else None for crop in crops]
+    readings = [plate_cache.get(key) if key is not None else None for key in keys]
+    pending = [i for i, reading in enumerate(readings) if reading is None]
+    for i, reading in zip(pending, helper.read_plates(yolo_license_plate, [crops[i] for i in pending])):
+        readings[i] = reading
+        if keys[i] is not None:
+            plate_cache.put(keys[i], reading)
+    return readings
+
+def recognize_images(imgs, plate_cache=None):
+    # Detect plates on all images in one batched call, then OCR every crop in one batched call
+    results = yolo_LP_detect(imgs, size=640, return_raw=True).xyxy
+    license_plates = ["Unknown"] * len(imgs)
+    best_scores = [0.0] * len(imgs)
+
+    crops = []
+    owners = []
+    direct = []
+    for i, (img, result) in enumerate(zip(imgs, results)):
+        list_plates = result.tolist()
+        if len(list_plates) == 0:
+            # Try direct OCR on the image if no plate is detected
+            direct.append(i)
+            continue
+        for plate in list_plates:
+            x = int(plate[0])  # xmin
+            y = int(plate[1])  # ymin
+            w = int(plate[2] - plate[0])  # xmax - xmin
+            h = int(plate[3] - plate[1])  # ymax - ymin
+            crops.append(img[y:y+h, x:x+w])
+            owners.append(i)
+
+    for i, (lp, score) in zip(owners, read_crops(crops, plate_cache)):
+        if lp != "unknown" and score > best_scores[i]:
+            license_plates[i] = lp
+            best_scores[i] = score
+
+    direct_imgs = [imgs[i] for i in direct]
+    for i, (lp, score) in zip(direct, helper.read_plates(yolo_license_plate, direct_imgs, deskew=False)):
+        if lp != "unknown":
+            license_plates[i] = lp
+
+    return license_plates
+
+def get_priority(default):
+    # ?priority= or X-Priority header, unknown values fall back to the endpoint's default
+    priority = request.args.get('priority', request.headers.get('X-Priority', default)).lower()
+    return priority if priority in PRIORITIES else default
+
+def get_deadline(priority, arrived):
+    # ?deadline_ms= or X-Deadline-Ms header, relative to when the request arrived
+    deadline_ms = request.args.get('deadline_ms', request.headers.get('X-Deadline-Ms'))
+    try:
+        return arrived + float(deadline_ms) / 1000
+    except (TypeError, ValueError):
+        return arrived + DEADLINES[priority]
+
+def overloaded_response(e):
+    response = jsonify({"success": False, "error": f"Service overloaded: {e}"})
+    response.status_code = 503
+    response.headers['Retry-After'] = str(e.retry_after)
+    return response
+
+def get_upload_bytes(max_bytes=None):
+    # Returns (bytes, error message) from a multipart upload, a raw image body or base64 JSON,
+    # raises RequestEntityTooLarge (413) for a body over max_bytes (MAX_UPLOAD_BYTES) before buffering it
+    max_bytes = max_bytes or MAX_UPLOAD_BYTES
+    if request.content_length is not None and request.content_length > max_bytes:
+        raise RequestEntityTooLarge()
+
+    if request.files:
+        if 'image' not in request.files:
+            return None, "No image provided"
+        file = request.files['image']
+        if file.filename == '':
+            return None, "No image selected"
+        return file.read(), None
+
+    if request.is_json:
+        data = request.get_json(silent=True) or {}
+        if not isinstance(data, dict):
+            return None, "JSON body must be an object"
+        if not data.get('image'):
+            return None, "No image provided"
+        if not isinstance(data['image'], str):
+            return None, "image must be a base64 string"
+        image_bytes = image_io.decode_base64(data['image'])
+        if image_bytes is None:
+            return None, "Invalid base64 image"
+        return image_bytes, None
+
+    # Raw body (image/jpeg, image/png, application/octet-stream), chunked bodies are read up to the limit
+    image_bytes = request.stream.read(max_bytes + 1)
+    if len(image_bytes) > max_bytes:
+        raise RequestEntityTooLarge()
+    if not image_bytes:
+        return None, "No image provided"
+    return image_bytes, None
+
+@app.errorhandler(RequestEntityTooLarge)
+def upload_too_large(e):
+    return jsonify({"success": False, "error": "Upload too large"}), 413
+
 @app.route('/health', methods=['GET'])
 def health_check():
-    return jsonify({"status": "ok", "message": "License Plate Recognition API is running"})
+    return jsonify({
+        "status": "ok",
+        "message": "License Plate Recognition API is running",
+        "models": model_registry.registry.stats(),
+        "admission": admission.stats(),
+        "result_cache": {
+            "bytes": result_cache.stats(),
+            "plates": plate_cache.stats() if plate_cache is not None else None
+        }
+    })
+
+def recognize_response(license_plate, cached):
+    response = jsonify({
+        "success": True,
+        "licensePlate": license_plate
+    })
+    response.headers['X-Cache'] = 'HIT' if cached else 'MISS'
+    return response
 
 @app.route('/recognize', methods=['POST'])
 def recognize_license_plate():
-    if 'image' not in request.files:
-        return jsonify({"success": False, "error": "No image provided"}), 400
-
-    file = request.files['image']
-    if file.filename == '':
-        return jsonify({"success": False, "error": "No image selected"}), 400
-
-    # Save the uploaded file temporarily
-    filename = secure_filename(file.filename)
-    temp_dir = tempfile.gettempdir()  # Get system's temp directory
-    # Create a unique filename to avoid collisions
-    unique_filename = f"{int(time.time())}_{filename}"
-    temp_path = os.path.join(temp_dir, unique_filename)
-    file.save(temp_path)
+    arrived = time.time()
+    priority = get_priority('interactive')
+    deadline = get_deadline(priority, arrived)
+    image_bytes, error = get_upload_bytes()
+    if error:
+        return jsonify({"success": False, "error": error}), 400
 
     try:
-        # Read the image
-        img = cv2.imread(temp_path)
+        # Same bytes seen recently: answer without decoding or touching the models
+        max_side = request.args.get('max_side', type=int)
+        key = content_hash(image_bytes, max_side)
+        license_plate = result_cache.get(key)
+        if license_plate is not None:
+            return recognize_response(license_plate, cached=True)
+
+        # Decode the image straight from memory, optionally at reduced JPEG resolution
+        img = image_io.decode_image(image_bytes, max_side=max_side)
         if img is None:
             return jsonify({"success": False, "error": "Could not read image"}), 400
 
-        # Detect license plates
-        plates = yolo_LP_detect(img, size=640)
-        list_plates = plates.pandas().xyxy[0].values.tolist()
-        license_plate = "Unknown"
+        with admission.admit(priority, deadline):
+            license_plate = recognize_images([img], plate_cache=plate_cache)[0]
 
-        if len(list_plates) == 0:
-            # Try direct OCR on the image if no plate is detected
-            lp = helper.read_plate(yolo_license_plate, img)
-            if lp != "unknown":
-                license_plate = lp
-        else:
-            # Process each detected plate
-            for plate in list_plates:
-                flag = 0
-                x = int(plate[0])  # xmin
-                y = int(plate[1])  # ymin
-                w = int(plate[2] - plate[0])  # xmax - xmin
-                h = int(plate[3] - plate[1])  # ymax - ymin
-                crop_img = img[y:y+h, x:x+w]
-
-                # Try different rotations to get the best OCR result
-                for cc in range(0, 2):
-                    for ct in range(0, 2):
-                        lp = helper.read_plate(yolo_license_plate, utils_rotate.deskew(crop_img, cc, ct))
-                        if lp != "unknown":
-                            license_plate = lp
-                            flag = 1
-                            break
-                    if flag == 1:
-                        break
-
-        # Clean up
-        if os.path.exists(temp_path):
-            os.remove(temp_path)
-
-        return jsonify({
-            "success": True,
-            "licensePlate": license_plate
-        })
+        result_cache.put(key, license_plate)
+        return recognize_response(license_plate, cached=False)
 
+    except Overloaded as e:
+        return overloaded_response(e)
     except Exception as e:
-        # Clean up in case of error
-        if os.path.exists(temp_path):
-            os.remove(temp_path)
         return jsonify({"success": False, "error": str(e)}), 500
 
+def iter_batch_uploads():
+    # Yields (index, image bytes or None, error) from multipart 'images' fields or an NDJSON body
+    if request.files:
+        files = request.files.getlist('images') + request.files.getlist('image')
+        for index, file in enumerate(files):
+            yield index, file.read(), None
+        return
+
+    index = 0
+    for line in request.stream:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            image_bytes = image_io.decode_base64(json.loads(line).get('image') or '')
+        except (ValueError, AttributeError):
+            image_bytes = None
+        if not image_bytes:
+            yield index, None, "Invalid NDJSON line"
+        else:
+            yield index, image_bytes, None
+        index += 1
+
+@app.route('/recognize/batch', methods=['POST'])
+def recognize_license_plate_batch():
+    max_side = request.args.get('max_side', type=int)
+    batch_size = max(1, request.args.get('batch_size', BATCH_SIZE, type=int))
+    priority = get_priority('bulk')
+
+    # Shed before the response starts, once streaming each batch queues with its own deadline
+    try:
+        admission.check(priority)
+    except Overloaded as e:
+        return overloaded_response(e)
+
+    def run_batch(batch):
+        imgs = [img for _, img in batch]
+        try:
+            with admission.admit(priority, get_deadline(priority, time.time())):
+                license_plates = recognize_images(imgs)
+        except Exception as e:
+            return [{"index": index, "success": False, "error": str(e)} for index, _ in batch]
+        return [{"index": index, "success": True, "licensePlate": lp}
+                for (index, _), lp in zip(batch, license_plates)]
+
+    def generate():
+        # Stream one NDJSON line per image as soon as its batch is done
+        batch = []
+        for index, image_bytes, error in iter_batch_uploads():
+            img = image_io.decode_image(image_bytes, max_side=max_side) if error is None else None
+            if img is None:
+                result = {"index": index, "success": False, "error": error or "Could not read image"}
+                yield json.dumps(result) + "\n"
+                continue
+            batch.append((index, img))
+            if len(batch) >= batch_size:
+                for result in run_batch(batch):
+                    yield json.dumps(result) + "\n"
+                batch = []
+        if batch:
+            for result in run_batch(batch):
+                yield json.dumps(result) + "\n"
+
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
 if __name__ == '__main__':
-    app.run(host='0.0.0.0', port=4050, debug=True)
+    # Development server, production runs under gunicorn (see gunicorn.conf.py).
+    # FLASK_DEBUG=1 enables the debugger and reloader, the reloader loads the models a second time
+    app.run(host='0.0.0.0', port=4050, debug=os.getenv('FLASK_DEBUG') == '1')
@@ -0,0 +1,112 @@
+import collections
+import heapq
+import itertools
+import math
+import threading
+import time
+from contextlib import contextmanager
+
+
+class Overloaded(Exception):
+    """Request shed by admission control, retry_after is a hint in seconds"""
+
+    def __init__(self, reason, retry_after=1):
+        super().__init__(reason)
+        self.retry_after = retry_after
+
+
+class AdmissionQueue:
+    """Bounded priority queue in front of the models.
+
+    Requests of an earlier priority class always run before waiting requests of a later one. A request
+    is rejected up front when its class queue is full or it could not start before its deadline, and
+    is dropped if the deadline passes while it waits.
+    """
+
+    def __init__(self, capacities, concurrency=1, service_time=0.5):
+        self.capacities = dict(capacities)  # priority class -> max waiting requests, in priority order
+        self.ranks = {name: rank for rank, name in enumerate(self.capacities)}
+        self.concurrency = concurrency  # requests allowed on the models at once
+        self.service_time = service_time  # moving average seconds per request, seeds the wait estimate
+        self.condition = threading.Condition()
+        self.waiting = []  # heap of [rank, seq, priority]
+        self.counter = itertools.count()
+        self.running = 0
+        self.classes = {name: {"admitted": 0, "rejected": 0, "expired": 0,
+                               "waits": collections.deque(maxlen=1000)} for name in self.capacities}
+
+    def _depth(self, priority):
+        return sum(1 for entry in self.waiting if entry[2] == priority)
+
+    def _expected_wait(self, ahead):
+        return (ahead + self.running) * self.service_time / self.concurrency
+
+    def _retry_after(self):
+        return max(1, math.ceil(self._expected_wait(len(self.waiting))))
+
+    def check(self, priority):
+        # Raise Overloaded if a request of this class would be rejected right now
+        with self.condition:
+            if self._depth(priority) >= self.capacities[priority]:
+                self.classes[priority]["rejected"] += 1
+                raise Overloaded(f"{priority} queue is full", self._retry_after())
+
+    @contextmanager
+    def admit(self, priority, deadline):
+        # Block until the request may use the models, deadline is an absolute time.time()
+        stats = self.classes[priority]
+        arrived = time.time()
+        with self.condition:
+            if self._depth(priority) >= self.capacities[priority]:
+                stats["rejected"] += 1
+                raise Overloaded(f"{priority} queue is full", self._retry_after())
+            entry = [self.ranks[priority], next(self.counter), priority]
+            ahead = sum(1 for other in self.waiting if other < entry)
+            if arrived + self._expected_wait(ahead) > deadline:
+                stats["rejected"] += 1
+                raise Overloaded("deadline cannot be met", self._retry_after())
+
+            heapq.heappush(self.waiting, entry)
+            while self.running >= self.concurrency or self.waiting[0] is not entry:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    self.waiting.remove(entry)
+                    heapq.heapify(self.waiting)
+                    stats["expired"] += 1
+                    self.condition.notify_all()
+                    raise Overloaded("deadline expired while queued", self._retry_after())
+                self.condition.wait(remaining)
+            heapq.heappop(self.waiting)
+            self.running += 1
+            stats["admitted"] += 1
+            stats["waits"].append(time.time() - arrived)
+
+        start_time = time.time()
+        try:
+            yield
+        finally:
+            with self.condition:
+                self.running -= 1
+                self.service_time = 0.8 * self.service_time + 0.2 * (time.time() - start_time)
+                self.condition.notify_all()
+
+    def stats(self):
+        with self.condition:
+            classes = {}
+            for name, stats in self.classes.items():
+                waits = sorted(stats["waits"])
+                classes[name] = {
+                    "depth": self._depth(name),
+                    "capacity": self.capacities[name],
+                    "admitted": stats["admitted"],
+                    "rejected": stats["rejected"],
+                    "expired": stats["expired"],
+                    "avg_wait": round(sum(waits) / len(waits), 4) if waits else 0,
+                    "p99_wait": round(waits[min(len(waits) - 1, int(len(waits) * 0.99))], 4) if waits else 0
+                }
+            return {
+                "running": self.running,
+                "concurrency": self.concurrency,
+                "avg_service_time": round(self.service_time, 4),
+                "classes": classes
+            }
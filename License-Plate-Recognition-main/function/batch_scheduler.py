@@ -0,0 +1,115 @@
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+logger = logging.getLogger(__name__)
+
+
+class BatchScheduler:
+    """Collects single-frame detection requests from many cameras and runs them as one batched model call"""
+
+    def __init__(self, model, max_batch_size=8, max_wait=0.02, size=640, max_concurrency=None):
+        self.model = model
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait  # seconds to wait for more frames after the first one arrives
+        self.max_concurrency = max_concurrency  # most callers that can have a frame pending at once
+        self.size = size
+        self.requests = queue.Queue()
+        self.clients = 0
+        self.lock = threading.Lock()
+        self.running = False
+        self.thread = None
+
+        # Stats
+        self.batches = 0
+        self.frames = 0
+        self.batch_time = 0.0
+
+    def start(self):
+        if self.running:
+            return
+        self.running = True
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+        logger.info(f"Batch scheduler started (max_batch_size={self.max_batch_size}, max_wait={self.max_wait}s)")
+
+    def stop(self):
+        self.running = False
+        if self.thread is not None:
+            self.thread.join(timeout=1.0)
+
+    def register(self):
+        # One client per camera; a batch is dispatched as soon as every client has a frame pending
+        with self.lock:
+            self.clients += 1
+
+    def unregister(self):
+        with self.lock:
+            self.clients = max(0, self.clients - 1)
+
+    def submit(self, frame):
+        future = Future()
+        self.requests.put((frame, future))
+        return future
+
+    def detect(self, frame, timeout=None):
+        return self.submit(frame).result(timeout=timeout)
+
+    def _collect(self):
+        try:
+            batch = [self.requests.get(timeout=0.1)]
+        except queue.Empty:
+            return []
+
+        target = max(1, min(self.max_batch_size, self.clients, self.max_concurrency or self.clients))
+        deadline = time.time() + self.max_wait
+        while len(batch) < target:
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self.requests.get(timeout=remaining))
+            except queue.Empty:
+                break
+
+        # Take anything else already waiting without blocking
+        while len(batch) < self.max_batch_size:
+            try:
+                batch.append(self.requests.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while self.running:
+            batch = self._collect()
+            if not batch:
+                continue
+
+            frames = [frame for frame, _ in batch]
+            futures = [future for _, future in batch]
+            try:
+                start_time = time.time()
+                results = self.model(frames, size=self.size, return_raw=True).tolist()
+                self.batch_time += time.time() - start_time
+                self.batches += 1
+                self.frames += len(frames)
+                for future, result in zip(futures, results):
+                    future.set_result(result)
+            except Exception as e:
+                logger.error(f"Error in batch scheduler: {str(e)}")
+                for future in futures:
+                    if not future.done():
+                        future.set_exception(e)
+
+    def stats(self):
+        return {
+            "clients": self.clients,
+            "pending": self.requests.qsize(),
+            "batches": self.batches,
+            "frames": self.frames,
+            "avg_batch_size": round(self.frames / self.batches, 2) if self.batches else 0,
+            "avg_batch_time": round(self.batch_time / self.batches, 4) if self.batches else 0
+        }
@@ -0,0 +1,50 @@
+import collections
+import threading
+import time
+
+
+class EventBus:
+    """In-memory sequence-numbered event log that push clients can follow and resume from"""
+
+    def __init__(self, max_events=1000):
+        self.events = collections.deque(maxlen=max_events)  # oldest events are dropped first
+        self.seq = 0
+        self.condition = threading.Condition()
+
+    def publish(self, camera_id, event_type, data):
+        with self.condition:
+            self.seq += 1
+            event = {
+                "seq": self.seq,
+                "type": event_type,
+                "camera_id": camera_id,
+                "timestamp": time.time(),
+                **data
+            }
+            self.events.append(event)
+            self.condition.notify_all()
+        return event
+
+    def oldest_seq(self):
+        with self.condition:
+            return self.events[0]["seq"] if self.events else self.seq + 1
+
+    def since(self, seq, camera_id=None):
+        # Events after seq (optionally for one camera) and the head seq they were read at
+        with self.condition:
+            events = [e for e in self.events if e["seq"] > seq and (camera_id is None or e["camera_id"] == camera_id)]
+            return events, self.seq
+
+    def wait(self, seq, timeout=None):
+        # Block until an event newer than seq is published, returns the latest seq
+        with self.condition:
+            self.condition.wait_for(lambda: self.seq > seq, timeout=timeout)
+            return self.seq
+
+    def stats(self):
+        with self.condition:
+            return {
+                "seq": self.seq,
+                "buffered": len(self.events),
+                "oldest_seq": self.events[0]["seq"] if self.events else None
+            }
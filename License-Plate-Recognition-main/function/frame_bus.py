@@ -0,0 +1,88 @@
+import threading
+import time
+
+from function.frame_pool import FrameBuffer
+
+
+class FrameBus:
+    """Latest-frame mailbox of one camera: newer frames replace older ones, each with an ID and capture time,
+    and consumers block until a new one arrives"""
+
+    def __init__(self):
+        self.condition = threading.Condition()
+        self.frame_id = 0
+        self.buffer = None  # FrameBuffer of the current frame, the bus holds one reference
+        self.timestamp = 0.0  # capture time of the current frame
+        self.closed = False
+        self.subscribers = []  # callbacks run after each publish
+
+    def publish(self, frame, timestamp=None):
+        # frame is a FrameBuffer whose reference passes to the bus, or a plain array
+        buffer = frame if isinstance(frame, FrameBuffer) else FrameBuffer(None, frame)
+        with self.condition:
+            previous = self.buffer
+            self.frame_id += 1
+            self.buffer = buffer
+            self.timestamp = time.time() if timestamp is None else timestamp
+            self.condition.notify_all()
+            frame_id = self.frame_id
+        if previous is not None:
+            previous.release()
+        for callback in self.subscribers:
+            callback()
+        return frame_id
+
+    def subscribe(self, callback):
+        self.subscribers.append(callback)
+
+    def unsubscribe(self, callback):
+        if callback in self.subscribers:
+            self.subscribers.remove(callback)
+
+    def _current(self):
+        buffer = self.buffer.acquire() if self.buffer is not None else None
+        return self.frame_id, buffer, self.timestamp
+
+    def latest(self):
+        # Returns (frame_id, buffer, timestamp), the caller releases the buffer when done with it
+        with self.condition:
+            return self._current()
+
+    def wait(self, after_id, timeout=None):
+        # Like latest() for a frame newer than after_id, or the current one on timeout or close
+        with self.condition:
+            self.condition.wait_for(lambda: self.frame_id > after_id or self.closed, timeout=timeout)
+            return self._current()
+
+    def close(self):
+        with self.condition:
+            self.closed = True
+            previous, self.buffer = self.buffer, None
+            self.condition.notify_all()
+        if previous is not None:
+            previous.release()
+
+
+class DropPolicy:
+    """Which mailbox frames the detector takes: 'latest' (freshest frame every detection interval),
+    'every_nth' (every n-th captured frame) or 'burst' (latest, but every new frame while motion is active)"""
+
+    MODES = ('latest', 'every_nth', 'burst')
+
+    def __init__(self, mode='latest', n=5, burst_interval=0.0):
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown frame policy {mode}, expected one of {', '.join(self.MODES)}")
+        self.mode = mode
+        self.n = max(1, int(n))
+        self.burst_interval = burst_interval  # seconds between detections during a motion burst
+
+    def next_frame_id(self, last_id):
+        # Smallest frame ID the detector should take next
+        return last_id + (self.n if self.mode == 'every_nth' else 1)
+
+    def interval(self, detection_interval, motion_active=False):
+        if self.mode == 'every_nth':
+            return 0.0
+        if self.mode == 'burst' and motion_active:
+            return self.burst_interval
+        return detection_interval
@@ -0,0 +1,54 @@
+import threading
+import cv2
+
+
+def annotate(frame, plates, fps=None):
+    # Draw plate boxes (and FPS) on a copy, the captured frame is shared and must stay raw
+    frame = frame.copy()
+    for plate in plates:
+        x, y, w, h = plate["bbox"]
+        cv2.rectangle(frame, (x, y), (x+w, y+h), (0, 0, 255), 2)
+        cv2.putText(frame, plate["license_plate"], (x, y-10), cv2.FONT_HERSHEY_SIMPLEX, 0.9, (36, 255, 12), 2)
+    if fps is not None:
+        cv2.putText(frame, f"FPS: {int(fps)}", (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 1, (100, 255, 0), 2)
+    return frame
+
+
+class FrameEncoder:
+    """Per-camera JPEG cache: each captured frame is encoded at most once raw and once annotated"""
+
+    def __init__(self, quality=95):
+        self.quality = quality
+        self.lock = threading.Lock()
+        self.cache = {}  # kind -> (key, jpeg bytes), key is the frame_id (plus detection version if annotated)
+        self.encoded = 0
+        self.served = 0
+
+    def _get(self, kind, key, render):
+        # Viewers asking for a frame that is already encoded share the bytes, the lock makes
+        # concurrent viewers of a new frame wait for one encode instead of each doing their own
+        with self.lock:
+            self.served += 1
+            cached = self.cache.get(kind)
+            if cached is not None and cached[0] == key:
+                return cached[1]
+            ret, buffer = cv2.imencode('.jpg', render(), [cv2.IMWRITE_JPEG_QUALITY, self.quality])
+            if not ret:
+                return None
+            jpeg = buffer.tobytes()
+            self.cache[kind] = (key, jpeg)
+            self.encoded += 1
+            return jpeg
+
+    def raw(self, frame_id, frame):
+        return self._get("raw", frame_id, lambda: frame)
+
+    def annotated(self, frame_id, frame, plates, fps=None, version=0):
+        # version identifies the detection result drawn, a new result re-encodes the same frame
+        return self._get("annotated", (frame_id, version), lambda: annotate(frame, plates, fps))
+
+    def stats(self):
+        return {
+            "jpeg_encoded": self.encoded,
+            "jpeg_served": self.served
+        }
@@ -0,0 +1,124 @@
+import threading
+import numpy as np
+
+
+class MemoryBudget:
+    """Service-wide cap on bytes held by frame pools (0 = unlimited)"""
+
+    def __init__(self, max_bytes=0):
+        self.max_bytes = max_bytes
+        self.used = 0
+        self.lock = threading.Lock()
+
+    def reserve(self, nbytes):
+        with self.lock:
+            if self.max_bytes and self.used + nbytes > self.max_bytes:
+                return False
+            self.used += nbytes
+            return True
+
+    def free(self, nbytes):
+        with self.lock:
+            self.used = max(0, self.used - nbytes)
+
+    def stats(self):
+        return {
+            "budget_mb": round(self.max_bytes / 1024 ** 2, 1) if self.max_bytes else None,
+            "used_mb": round(self.used / 1024 ** 2, 1)
+        }
+
+
+class FrameBuffer:
+    """One reusable frame array, returned to its pool when the last reference is released"""
+
+    def __init__(self, pool, array, generation=0):
+        self.pool = pool
+        self.array = array
+        self.generation = generation  # pool configuration the buffer was allocated for
+        self.refs = 0
+
+    def acquire(self):
+        if self.pool is not None:
+            self.pool._acquire(self)
+        return self
+
+    def release(self):
+        if self.pool is not None:
+            self.pool._release(self)
+
+    def __enter__(self):
+        return self.array
+
+    def __exit__(self, *args):
+        self.release()
+
+
+class FramePool:
+    """Fixed ring of preallocated frame buffers for one camera, sized on the first frame"""
+
+    def __init__(self, count=4, budget=None):
+        self.count = count
+        self.budget = budget
+        self.lock = threading.Lock()
+        self.shape = None
+        self.dtype = None
+        self.free = []
+        self.allocated = 0
+        self.generation = 0  # bumped by configure(), older buffers are dropped on release
+        self.exhausted = 0  # frames dropped because every buffer was still referenced
+
+    @property
+    def nbytes(self):
+        return int(np.prod(self.shape)) * np.dtype(self.dtype).itemsize if self.shape else 0
+
+    def configure(self, shape, dtype=np.uint8):
+        # (Re)size the ring for a frame shape, buffers still in use are dropped when released
+        with self.lock:
+            if self.budget is not None and self.allocated:
+                self.budget.free(self.allocated * self.nbytes)
+            self.shape, self.dtype = tuple(shape), np.dtype(dtype)
+            self.generation += 1
+            # Shrink the ring to fit the budget, but the bus holds one buffer so two is the minimum
+            count = max(2, self.count)
+            while count >= 2 and self.budget is not None and not self.budget.reserve(count * self.nbytes):
+                count -= 1
+            if count < 2:
+                self.shape, self.free, self.allocated = None, [], 0
+                raise MemoryError(f"Frame memory budget exhausted, cannot hold a {shape} frame")
+            self.free = [FrameBuffer(self, np.empty(self.shape, self.dtype), self.generation) for _ in range(count)]
+            self.allocated = count
+
+    def get(self):
+        # A free buffer holding one reference, or None if all are in use
+        with self.lock:
+            if not self.free:
+                self.exhausted += 1
+                return None
+            buffer = self.free.pop()
+            buffer.refs = 1
+            return buffer
+
+    def _acquire(self, buffer):
+        with self.lock:
+            buffer.refs += 1
+
+    def _release(self, buffer):
+        with self.lock:
+            buffer.refs -= 1
+            if buffer.refs == 0 and buffer.generation == self.generation:
+                self.free.append(buffer)
+
+    def close(self):
+        with self.lock:
+            if self.budget is not None and self.allocated:
+                self.budget.free(self.allocated * self.nbytes)
+            self.free, self.allocated = [], 0
+            self.generation += 1
+
+    def stats(self):
+        return {
+            "pool_buffers": self.allocated,
+            "pool_free": len(self.free),
+            "pool_exhausted": self.exhausted,
+            "pool_mb": round(self.allocated * self.nbytes / 1024 ** 2, 1)
+        }
@@ -1,4 +1,6 @@
 import math
+import numpy as np
+import function.utils_rotate as utils_rotate
 
 # license plate type classification helper function
 def linear_equation(x1, y1, x2, y2):
@@ -13,52 +15,86 @@ def check_point_linear(x, y, x1, y1, x2, y2):
 
 # detect character and number in license plate
 def read_plate(yolo_license_plate, im):
-    LP_type = "1"
-    results = yolo_license_plate(im)
-    bb_list = results.pandas().xyxy[0].values.tolist()
-    if len(bb_list) == 0 or len(bb_list) < 7 or len(bb_list) > 10:
-        return "unknown"
-    center_list = []
-    y_mean = 0
-    y_sum = 0
-    for bb in bb_list:
-        x_c = (bb[0]+bb[2])/2
-        y_c = (bb[1]+bb[3])/2
-        y_sum += y_c
-        center_list.append([x_c,y_c,bb[-1]])
+    results = yolo_license_plate(im, return_raw=True)
+    return plate_from_pred(results.xyxy[0], results.names)[0]
+
+# deskew variants (change_cons, center_thres) in the order they are tried
+DESKEW_VARIANTS = [(0, 0), (0, 1), (1, 0), (1, 1)]
+
+# OCR the deskew variants of every plate crop in one batched call, keep the best variant per crop
+# returns (plate, score) per crop, or (plate, score, char_confidences) with with_chars=True
+def read_plates(yolo_license_plate, crops, size=640, deskew=True, variants=4, with_chars=False):
+    n_variants = max(1, min(variants, len(DESKEW_VARIANTS))) if deskew else 1
+    images = []
+    for crop in crops:
+        if crop.size == 0:
+            continue
+        if not deskew:
+            images.append(crop)
+            continue
+        for cc, ct in DESKEW_VARIANTS[:n_variants]:
+            images.append(utils_rotate.deskew(crop, cc, ct))
+    readings = plates_from_results(yolo_license_plate(images, size=size, return_raw=True)) if images else []
+
+    plates = []
+    i = 0
+    for crop in crops:
+        best = ("unknown", 0.0, [])
+        if crop.size == 0:
+            plates.append(best if with_chars else best[:2])
+            continue
+        for reading in readings[i:i + n_variants]:
+            if reading[0] != "unknown" and reading[1] > best[1]:
+                best = reading
+        plates.append(best if with_chars else best[:2])
+        i += n_variants
+    return plates
 
-    # find 2 point to draw line
-    l_point = center_list[0]
-    r_point = center_list[0]
-    for cp in center_list:
-        if cp[0] < l_point[0]:
-            l_point = cp
-        if cp[0] > r_point[0]:
-            r_point = cp
-    for ct in center_list:
-        if l_point[0] != r_point[0]:
-            if (check_point_linear(ct[0], ct[1], l_point[0], l_point[1], r_point[0], r_point[1]) == False):
-                LP_type = "2"
+# assemble plate strings for every image of a batched OCR call
+def plates_from_results(results):
+    return [plate_from_pred(pred, results.names) for pred in results.xyxy]
+
+# assemble plate string, mean character confidence and per-character confidences from one OCR prediction
+# pred is the raw (n, 6) [xmin, ymin, xmax, ymax, confidence, class] detections array
+def plate_from_pred(pred, names):
+    if hasattr(pred, 'cpu'):
+        pred = pred.cpu().numpy()
+    pred = np.asarray(pred, dtype=np.float64)
+    n = len(pred)
+    if n < 7 or n > 10:
+        return "unknown", 0.0, []
+
+    score = float(pred[:, 4].mean())
+    x_c = (pred[:, 0] + pred[:, 2]) / 2
+    y_c = (pred[:, 1] + pred[:, 3]) / 2
+    labels = [str(names[int(c)]) for c in pred[:, 5]]
+
+    # 2 line plate if any center is off the line through the leftmost and rightmost characters
+    LP_type = "1"
+    l, r = np.argmin(x_c), np.argmax(x_c)
+    x1, y1, x2, y2 = x_c[l], y_c[l], x_c[r], y_c[r]
+    if x1 != x2:
+        b = y1 - (y2 - y1) * x1 / (x2 - x1)
+        a = (y1 - b) / x1
+        y_pred = a * x_c + b
+        tol = np.maximum(1e-9 * np.maximum(np.abs(y_pred), np.abs(y_c)), 3)  # math.isclose(abs_tol=3)
+        if np.any(np.abs(y_pred - y_c) > tol):
+            LP_type = "2"
 
-    y_mean = int(int(y_sum) / len(bb_list))
-    size = results.pandas().s
+    # sequential sum keeps the same rounding as summing in a loop
+    y_mean = int(int(np.add.accumulate(y_c)[-1]) / n)
 
     # 1 line plates and 2 line plates
-    line_1 = []
-    line_2 = []
-    license_plate = ""
     if LP_type == "2":
-        for c in center_list:
-            if int(c[1]) > y_mean:
-                line_2.append(c)
-            else:
-                line_1.append(c)
-        for l1 in sorted(line_1, key = lambda x: x[0]):
-            license_plate += str(l1[2])
-        license_plate += "-"
-        for l2 in sorted(line_2, key = lambda x: x[0]):
-            license_plate += str(l2[2])
+        lower = y_c.astype(np.int64) > y_mean
+        line_1 = np.flatnonzero(~lower)
+        line_2 = np.flatnonzero(lower)
+        line_1 = line_1[np.argsort(x_c[line_1], kind='stable')]
+        line_2 = line_2[np.argsort(x_c[line_2], kind='stable')]
+        license_plate = "".join(labels[i] for i in line_1) + "-" + "".join(labels[i] for i in line_2)
+        char_confs = [pred[i, 4] for i in line_1] + [score] + [pred[i, 4] for i in line_2]
     else:
-        for l in sorted(center_list, key = lambda x: x[0]):
-            license_plate += str(l[2])
-    return license_plate
\ No newline at end of file
+        order = np.argsort(x_c, kind='stable')
+        license_plate = "".join(labels[i] for i in order)
+        char_confs = [pred[i, 4] for i in order]
+    return license_plate, score, [float(c) for c in char_confs]
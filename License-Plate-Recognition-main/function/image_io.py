@@ -0,0 +1,70 @@
+import base64
+import binascii
+import cv2
+import numpy as np
+
+# cv2.imdecode flags for JPEG DCT-domain downscaling (decodes fewer pixels, not a resize afterwards)
+REDUCED_FLAGS = {
+    1: cv2.IMREAD_COLOR,
+    2: cv2.IMREAD_REDUCED_COLOR_2,
+    4: cv2.IMREAD_REDUCED_COLOR_4,
+    8: cv2.IMREAD_REDUCED_COLOR_8,
+}
+
+# start-of-frame markers carrying the image size (excludes DHT 0xC4, JPG 0xC8, DAC 0xCC)
+SOF_MARKERS = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+
+def jpeg_size(data):
+    # read (width, height) from the JPEG header without decoding, None if not a JPEG
+    if data[:2] != b'\xff\xd8':
+        return None
+    i = 2
+    while i + 9 < len(data):
+        if data[i] != 0xFF:
+            return None
+        marker = data[i + 1]
+        if marker == 0xFF:  # fill byte
+            i += 1
+            continue
+        length = int.from_bytes(data[i + 2:i + 4], 'big')
+        if marker in SOF_MARKERS:
+            height = int.from_bytes(data[i + 5:i + 7], 'big')
+            width = int.from_bytes(data[i + 7:i + 9], 'big')
+            return width, height
+        i += 2 + length
+    return None
+
+def reduce_factor(data, max_side):
+    # largest JPEG reduction factor that keeps the longest side >= max_side
+    size = jpeg_size(data) if max_side else None
+    if size is None:
+        return 1
+    factor = 1
+    for f in (2, 4, 8):
+        if max(size) / f >= max_side:
+            factor = f
+    return factor
+
+def decode_image(data, max_side=None):
+    # decode an encoded image held in memory, optionally at reduced JPEG resolution
+    buf = np.frombuffer(data, dtype=np.uint8)
+    if buf.size == 0:
+        return None
+    return cv2.imdecode(buf, REDUCED_FLAGS[reduce_factor(data, max_side)])
+
+def decode_base64(text):
+    # accept plain base64 or a data URL ("data:image/jpeg;base64,...")
+    if text.startswith('data:'):
+        text = text.split(',', 1)[-1]
+    try:
+        return base64.b64decode(text, validate=True)
+    except (binascii.Error, ValueError):
+        return None
+
+def perceptual_hash(img, hash_size=16):
+    # hash_size**2-bit difference hash as hex: survives re-encoding and small exposure changes,
+    # not crops or camera moves
+    gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY) if img.ndim == 3 else img
+    small = cv2.resize(gray, (hash_size + 1, hash_size), interpolation=cv2.INTER_AREA)
+    bits = (small[:, 1:] > small[:, :-1]).flatten()
+    return np.packbits(bits).tobytes().hex()
@@ -0,0 +1,154 @@
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class LaneState:
+    def __init__(self, lane, now):
+        self.lane = lane
+        self.last_run = now  # first run is due one interval after the lane is added
+        self.next_due = now
+        self.busy = False
+        self.backoff_until = 0.0  # a lane that raised is skipped until then
+        self.watched = False
+        self.runs = 0
+        self.frames = 0
+        self.run_time = 0.0
+        self.lateness = 0.0  # summed seconds between a lane being due and a worker starting it
+
+
+class LaneScheduler:
+    """K worker threads serving every camera lane: the most overdue ready lane runs next, active lanes weighted up.
+
+    A lane provides step(), interval(active), is_active(now), frame_ready() and watch/unwatch(callback).
+    """
+
+    def __init__(self, workers=None, active_weight=4.0, poll_interval=0.005):
+        self.workers = workers or os.cpu_count() or 1
+        self.active_weight = active_weight  # how much faster an active lane's overdue time counts
+        self.poll_interval = poll_interval  # re-check interval when a due lane's source cannot notify
+        self.lanes = {}  # lane -> LaneState
+        self.condition = threading.Condition()
+        self.running = False
+        self.threads = []
+
+    def start(self):
+        if self.running:
+            return
+        self.running = True
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._run, name=f"lane-worker-{i}", daemon=True)
+            thread.start()
+            self.threads.append(thread)
+        logger.info(f"Lane scheduler started with {self.workers} workers")
+
+    def stop(self):
+        with self.condition:
+            self.running = False
+            self.condition.notify_all()
+        for thread in self.threads:
+            thread.join(timeout=1.0)
+        self.threads = []
+
+    def add(self, lane):
+        with self.condition:
+            state = LaneState(lane, time.time())
+            self.lanes[lane] = state
+            self.condition.notify_all()
+        state.watched = lane.watch(self.notify)
+
+    def remove(self, lane):
+        with self.condition:
+            state = self.lanes.get(lane)
+            if state is None:
+                return
+            self.condition.wait_for(lambda: not state.busy, timeout=5.0)
+            del self.lanes[lane]
+        if state.watched:
+            lane.unwatch(self.notify)
+
+    def notify(self):
+        # A camera published a frame
+        with self.condition:
+            self.condition.notify()
+
+    def _pick(self, now):
+        # Returns (state, None) for the lane to run, or (None, seconds to wait)
+        best, best_score = None, None
+        wait = 1.0
+        for state in self.lanes.values():
+            if state.busy:
+                continue
+            if now < state.backoff_until:
+                wait = min(wait, state.backoff_until - now)
+                continue
+            try:
+                active = state.lane.is_active(now)
+                state.next_due = state.last_run + state.lane.interval(active)
+                ready = now >= state.next_due and state.lane.frame_ready()
+            except Exception as e:
+                # A broken lane is backed off, it must not take the shared workers down with it
+                logger.error(f"Error scheduling lane {getattr(state.lane, 'camera_id', state.lane)}: {str(e)}")
+                state.backoff_until = now + 1.0
+                continue
+            if now < state.next_due:
+                wait = min(wait, state.next_due - now)
+                continue
+            if not ready:
+                if not state.watched:
+                    wait = min(wait, self.poll_interval)
+                continue
+            score = (now - state.next_due) * (self.active_weight if active else 1.0)
+            if best is None or score > best_score:
+                best, best_score = state, score
+        return best, wait
+
+    def _run(self):
+        while True:
+            with self.condition:
+                if not self.running:
+                    return
+                now = time.time()
+                state, wait = self._pick(now)
+                if state is None:
+                    self.condition.wait(timeout=wait)
+                    continue
+                state.busy = True
+                state.lateness += now - state.next_due
+
+            start_time = time.time()
+            processed = failed = False
+            try:
+                processed = state.lane.step()
+            except Exception as e:
+                logger.error(f"Error running lane {getattr(state.lane, 'camera_id', state.lane)}: {str(e)}")
+                failed = True
+            finally:
+                with self.condition:
+                    state.busy = False
+                    state.runs += 1
+                    state.frames += int(bool(processed))
+                    state.run_time += time.time() - start_time
+                    if processed:
+                        state.last_run = start_time
+                    elif failed:
+                        state.backoff_until = time.time() + 1.0
+                    self.condition.notify_all()
+
+    def stats(self):
+        with self.condition:
+            return {
+                "workers": self.workers,
+                "lanes": {
+                    getattr(state.lane, 'camera_id', str(state.lane)): {
+                        "runs": state.runs,
+                        "frames": state.frames,
+                        "active": state.lane.is_active(),
+                        "avg_run_time": round(state.run_time / state.runs, 4) if state.runs else 0,
+                        "avg_lateness": round(state.lateness / state.runs, 4) if state.runs else 0
+                    } for state in self.lanes.values()
+                }
+            }
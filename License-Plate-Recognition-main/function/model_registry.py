@@ -0,0 +1,165 @@
+import logging
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+import torch
+
+logger = logging.getLogger(__name__)
+
+
+class SharedModel:
+    """Thread-safe wrapper around one loaded YOLOv5 hub model"""
+
+    def __init__(self, weights, model, load_time, source='hub'):
+        self.weights = weights
+        self.model = model
+        self.load_time = load_time
+        self.source = source  # 'cache' or 'hub'
+        self.first_inference_time = None
+        self.lock = threading.Lock()
+        self.calls = 0
+        self.inference_time = 0.0
+
+    @property
+    def conf(self):
+        return self.model.conf
+
+    @conf.setter
+    def conf(self, value):
+        self.model.conf = value
+
+    @property
+    def names(self):
+        return self.model.names
+
+    def memory_bytes(self):
+        # parameters and registered buffers of the wrapped model
+        tensors = list(self.model.parameters()) + list(self.model.buffers())
+        return sum(t.numel() * t.element_size() for t in tensors)
+
+    def warmup(self, size=640):
+        # Time to first inference, run once at load so the first real frame does not pay for it
+        start_time = time.time()
+        self.model(np.zeros((size, size, 3), dtype=np.uint8), size=size, return_raw=True)
+        self.first_inference_time = time.time() - start_time
+
+    def __call__(self, *args, **kwargs):
+        # AutoShape/Detect keep per-call state (grids, anchors), so one caller at a time
+        with self.lock:
+            start_time = time.time()
+            results = self.model(*args, **kwargs)
+            self.inference_time += time.time() - start_time
+            self.calls += 1
+        return results
+
+    def stats(self):
+        return {
+            "weights": self.weights,
+            "source": self.source,
+            "load_time": round(self.load_time, 3),
+            "first_inference_time": round(self.first_inference_time, 3) if self.first_inference_time is not None else None,
+            "memory_mb": round(self.memory_bytes() / 1024 ** 2, 2),
+            "calls": self.calls,
+            "avg_inference_time": round(self.inference_time / self.calls, 4) if self.calls else 0
+        }
+
+
+class ModelRegistry:
+    """Process-wide cache that loads each weights file once and shares it between callers"""
+
+    def __init__(self, repo_dir='yolov5', cache_dir='model/cache'):
+        self.repo_dir = repo_dir
+        self.cache_dir = cache_dir
+        self.models = {}
+        self.lock = threading.Lock()
+
+    def get(self, weights, conf=None):
+        with self.lock:
+            shared = self.models.get(weights)
+            if shared is None:
+                shared = self._load(weights)
+                self.models[weights] = shared
+        if conf is not None:
+            shared.conf = conf
+        return shared
+
+    def cache_path(self, weights):
+        name = os.path.splitext(os.path.basename(weights))[0]
+        return os.path.join(self.cache_dir, f"{name}.autoshape.pt")
+
+    def _source_info(self, weights):
+        # A cached artifact is only valid for the exact weights file and torch build it was made from
+        st = os.stat(weights)
+        return {"size": st.st_size, "mtime": int(st.st_mtime), "torch": torch.__version__}
+
+    def _load_cached(self, weights):
+        path = self.cache_path(weights)
+        if not os.path.exists(path):
+            return None
+        # Pickled modules reference yolov5's top-level packages (models, utils)
+        repo_dir = os.path.abspath(self.repo_dir)
+        if repo_dir not in sys.path:
+            sys.path.append(repo_dir)
+        try:
+            try:
+                ckpt = torch.load(path, map_location='cpu', weights_only=False)
+            except TypeError:  # torch < 1.13
+                ckpt = torch.load(path, map_location='cpu')
+            if not isinstance(ckpt, dict) or not isinstance(ckpt.get("model"), torch.nn.Module):
+                raise ValueError(f"expected a cache dict with a model, got {type(ckpt).__name__}")
+            if ckpt.get("source") != self._source_info(weights):
+                logger.info(f"Model cache {path} is stale, rebuilding")
+                return None
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable model cache {path}: {str(e)}")
+            return None
+        return ckpt["model"]
+
+    def _save_cached(self, weights, model):
+        path = self.cache_path(weights)
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            torch.save({"model": model, "source": self._source_info(weights)}, tmp_path)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.warning(f"Could not write model cache {path}: {str(e)}")
+
+    def _load(self, weights):
+        # Fast path: fused, AutoShape-wrapped model saved by a previous start, no hub or requirement checks
+        start_time = time.time()
+        model = self._load_cached(weights)
+        source = 'cache'
+        if model is None:
+            model = torch.hub.load(self.repo_dir, 'custom', path=weights, source='local')
+            source = 'hub'
+            self._save_cached(weights, model)
+        model.eval()
+        shared = SharedModel(weights, model, time.time() - start_time, source)
+        shared.warmup()
+        logger.info(f"Loaded model {weights} from {source} in {shared.load_time:.2f}s, "
+                    f"first inference {shared.first_inference_time:.2f}s "
+                    f"({shared.memory_bytes() / 1024 ** 2:.1f} MB)")
+        return shared
+
+    def stats(self):
+        with self.lock:
+            models = list(self.models.values())
+        return {shared.weights: shared.stats() for shared in models}
+
+
+registry = ModelRegistry()
+
+
+def get_model(weights, conf=None):
+    return registry.get(weights, conf)
+
+
+if __name__ == '__main__':
+    # Build model caches ahead of deployment: python -m function.model_registry model/LP_detector.pt ...
+    logging.basicConfig(level=logging.INFO)
+    for weights in sys.argv[1:]:
+        get_model(weights)
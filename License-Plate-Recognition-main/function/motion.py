@@ -0,0 +1,65 @@
+import time
+import cv2
+import numpy as np
+
+class MotionGate:
+    """Cheap frame-change test run before the detector so static scenes skip YOLO"""
+
+    def __init__(self, threshold=0.01, pixel_threshold=25, width=160, roi=None, alpha=0.05, hold=1.0, idle_interval=5.0):
+        self.threshold = threshold  # fraction of ROI pixels that must change to count as motion
+        self.pixel_threshold = pixel_threshold  # per-pixel gray level difference from the background
+        self.width = width  # frames are downsampled to this width before comparing
+        self.roi = roi  # optional lane ROI [x1, y1, x2, y2] normalized to 0-1
+        self.alpha = alpha  # background running average rate
+        self.hold = hold  # keep detecting this many seconds after motion stops
+        self.idle_interval = idle_interval  # force a detection this often on a static scene (0 disables)
+        self.background = None
+        self.score = 0.0
+        self.last_motion_time = 0
+        self.last_pass_time = 0
+        self.passed = 0
+        self.skipped = 0
+
+    def _prepare(self, frame):
+        h, w = frame.shape[:2]
+        small = cv2.resize(frame, (self.width, max(1, int(h * self.width / w))), interpolation=cv2.INTER_AREA)
+        gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY) if small.ndim == 3 else small
+        gray = cv2.GaussianBlur(gray, (5, 5), 0)
+        if self.roi is not None:
+            sh, sw = gray.shape
+            x1, y1, x2, y2 = self.roi
+            gray = gray[int(y1 * sh):max(int(y2 * sh), int(y1 * sh) + 1), int(x1 * sw):max(int(x2 * sw), int(x1 * sw) + 1)]
+        return gray.astype(np.float32)
+
+    def update(self, frame):
+        # Returns the fraction of ROI pixels that differ from the background model
+        gray = self._prepare(frame)
+        if self.background is None or self.background.shape != gray.shape:
+            self.background = gray.copy()
+            self.score = 1.0  # first frame counts as motion so the lane gets an initial detection
+            return self.score
+        diff = cv2.absdiff(gray, self.background)
+        self.score = float(np.count_nonzero(diff > self.pixel_threshold)) / diff.size
+        cv2.accumulateWeighted(gray, self.background, self.alpha)
+        return self.score
+
+    def should_detect(self, frame, now=None):
+        now = time.time() if now is None else now
+        if self.update(frame) >= self.threshold:
+            self.last_motion_time = now
+        run = now - self.last_motion_time <= self.hold
+        if not run and self.idle_interval:
+            run = now - self.last_pass_time >= self.idle_interval
+        if run:
+            self.passed += 1
+            self.last_pass_time = now
+        else:
+            self.skipped += 1
+        return run
+
+    def stats(self):
+        return {
+            "motion_score": round(self.score, 4),
+            "detections_run": self.passed,
+            "detections_skipped": self.skipped
+        }
@@ -0,0 +1,127 @@
+import itertools
+import logging
+import multiprocessing as mp
+import os
+import queue
+import threading
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+
+logger = logging.getLogger(__name__)
+
+
+class InferenceWorkerPool:
+    """Fixed set of inference processes, each running the frame processors of the cameras assigned to it"""
+
+    def __init__(self, target, workers=None, on_result=None):
+        self.ctx = mp.get_context('spawn')  # children must not inherit torch/OpenCV thread state
+        self.workers = workers or os.cpu_count() or 1
+        self.threads = max(1, (os.cpu_count() or 1) // self.workers)  # torch threads per worker
+        self.target = target  # target(commands, results, threads), runs in each worker
+        self.on_result = on_result  # called in the front end with (camera_id, kind, payload)
+        self.results = self.ctx.Queue()
+        self.commands = []
+        self.processes = []
+        self.assignments = {}  # camera_id -> worker index
+        self.pending = {}  # request id -> Future for the worker's reply
+        self.request_ids = itertools.count(1)
+        self.lock = threading.Lock()
+        self.running = False
+        self.thread = None
+
+    def start(self):
+        if self.running:
+            return
+        self.running = True
+        for _ in range(self.workers):
+            commands = self.ctx.Queue()
+            process = self.ctx.Process(target=self.target, args=(commands, self.results, self.threads), daemon=True)
+            process.start()
+            self.commands.append(commands)
+            self.processes.append(process)
+        self.thread = threading.Thread(target=self._drain, daemon=True)
+        self.thread.start()
+        logger.info(f"Started {self.workers} inference workers ({self.threads} threads each)")
+
+    def add_camera(self, camera_id, config):
+        # Least-loaded worker takes the camera
+        with self.lock:
+            loads = [0] * self.workers
+            for worker in self.assignments.values():
+                loads[worker] += 1
+            worker = loads.index(min(loads))
+            self.assignments[camera_id] = worker
+        self.commands[worker].put(("add", camera_id, config))
+        return RemoteProcessor(self, camera_id)
+
+    def remove_camera(self, camera_id):
+        with self.lock:
+            worker = self.assignments.pop(camera_id, None)
+        if worker is not None:
+            self.commands[worker].put(("remove", camera_id, None))
+
+    def request(self, camera_id, command, args=None, timeout=10.0):
+        # Run a command on the worker that owns the camera and wait for its reply
+        with self.lock:
+            worker = self.assignments.get(camera_id)
+            request_id = next(self.request_ids)
+            future = self.pending[request_id] = Future()
+        if worker is None:
+            raise KeyError(f"Camera {camera_id} is not assigned to a worker")
+        self.commands[worker].put((command, camera_id, {"id": request_id, "args": args or {}}))
+        try:
+            return future.result(timeout=timeout)
+        except FutureTimeout:
+            raise TimeoutError(f"No reply to {command} for camera {camera_id}")
+        finally:
+            with self.lock:
+                self.pending.pop(request_id, None)
+
+    def _drain(self):
+        while self.running:
+            try:
+                camera_id, kind, payload = self.results.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            if kind == "reply":
+                with self.lock:
+                    future = self.pending.get(payload["id"])
+                if future is not None:
+                    future.set_result(payload["result"])
+                continue
+            try:
+                if self.on_result is not None:
+                    self.on_result(camera_id, kind, payload)
+            except Exception as e:
+                logger.error(f"Error handling worker result for camera {camera_id}: {str(e)}")
+
+    def stop(self):
+        self.running = False
+        for commands in self.commands:
+            commands.put(("stop", None, None))
+        for process in self.processes:
+            process.join(timeout=2.0)
+        if self.thread is not None:
+            self.thread.join(timeout=1.0)
+
+    def stats(self):
+        with self.lock:
+            assignments = dict(self.assignments)
+        return {
+            "workers": self.workers,
+            "alive": sum(process.is_alive() for process in self.processes),
+            "assignments": assignments
+        }
+
+
+class RemoteProcessor:
+    """Stand-in for a FrameProcessor that runs in an inference worker"""
+
+    def __init__(self, pool, camera_id):
+        self.pool = pool
+        self.camera_id = camera_id
+
+    def snapshot(self, include_image=False):
+        return self.pool.request(self.camera_id, "snapshot", {"include_image": include_image})
+
+    def stop(self):
+        self.pool.remove_camera(self.camera_id)
@@ -0,0 +1,65 @@
+import collections
+import hashlib
+import threading
+import time
+
+
+def content_hash(data, *extra):
+    # Fast digest of upload bytes plus any options that change the result
+    digest = hashlib.blake2b(data, digest_size=16)
+    for value in extra:
+        digest.update(repr(value).encode())
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """Size-bounded LRU of recognition results with a time-to-live per entry"""
+
+    def __init__(self, max_entries=1024, ttl=60.0):
+        self.max_entries = max_entries
+        self.ttl = ttl  # seconds an entry is served after it was stored
+        self.entries = collections.OrderedDict()  # key -> (expires_at, value), least recently used first
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key):
+        now = time.time()
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and entry[0] <= now:
+                del self.entries[key]
+                self.expirations += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key, value):
+        if self.max_entries <= 0:
+            return
+        with self.lock:
+            self.entries[key] = (time.time() + self.ttl, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def stats(self):
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self.entries),
+                "max_entries": self.max_entries,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0,
+                "evictions": self.evictions,
+                "expirations": self.expirations
+            }
@@ -0,0 +1,194 @@
+import logging
+import time
+from multiprocessing import shared_memory
+
+import cv2
+import numpy as np
+
+from function.frame_pool import FrameBuffer, FramePool
+
+logger = logging.getLogger(__name__)
+
+# Header layout (float64): latest frame ID, latest slot, fps, grabbed, decoded, status, viewers, torn (discarded) reads,
+# then (frame_id, timestamp) per slot
+HEADER_FIELDS = 16
+FRAME_ID, SLOT, FPS, GRABBED, DECODED, STATUS, VIEWERS, TORN = range(8)
+STATUSES = ["INITIALIZING", "RUNNING", "ERROR", "STOPPED"]
+
+
+class SharedFrameRing:
+    """Ring of frames in shared memory, written by one capture process and read in place by any process"""
+
+    def __init__(self, name, shape, slots=4, create=False):
+        self.name = name
+        self.shape = tuple(shape)
+        self.slots = slots
+        header_bytes = (HEADER_FIELDS + 2 * slots) * 8
+        size = header_bytes + int(np.prod(self.shape)) * slots
+        if create:
+            self.shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        else:
+            # Readers are spawned from the same front end and share its resource tracker, so attaching
+            # does not add a second owner; the capture process unlinks the ring when it exits
+            self.shm = shared_memory.SharedMemory(name=name)
+        self.header = np.ndarray((HEADER_FIELDS + 2 * slots,), np.float64, self.shm.buf)
+        self.frames = np.ndarray((slots,) + self.shape, np.uint8, self.shm.buf, offset=header_bytes)
+        if create:
+            self.header[:] = 0
+
+    @property
+    def frame_id(self):
+        return int(self.header[FRAME_ID])
+
+    def next_slot(self):
+        # The writer fills the slot after the latest one, marking it invalid while it is being written
+        slot = (int(self.header[SLOT]) + 1) % self.slots
+        self.header[HEADER_FIELDS + 2 * slot] = -1
+        return slot, self.frames[slot]
+
+    def commit(self, slot, timestamp):
+        frame_id = self.frame_id + 1
+        self.header[HEADER_FIELDS + 2 * slot + 1] = timestamp
+        self.header[HEADER_FIELDS + 2 * slot] = frame_id
+        self.header[SLOT] = slot
+        self.header[FRAME_ID] = frame_id
+        return frame_id
+
+    def latest(self):
+        # (frame_id, slot, timestamp) of the newest complete frame, or None
+        for _ in range(3):
+            frame_id, slot = self.frame_id, int(self.header[SLOT])
+            if frame_id == 0:
+                return None
+            if self.slot_frame_id(slot) == frame_id:
+                return frame_id, slot, float(self.header[HEADER_FIELDS + 2 * slot + 1])
+        return None
+
+    def slot_frame_id(self, slot):
+        return int(self.header[HEADER_FIELDS + 2 * slot])
+
+    def stats(self):
+        return {
+            "fps": round(float(self.header[FPS]), 2),
+            "status": STATUSES[int(self.header[STATUS])],
+            "frames_grabbed": int(self.header[GRABBED]),
+            "frames_decoded": int(self.header[DECODED]),
+            "torn_reads": int(self.header[TORN])
+        }
+
+    def close(self):
+        self.header = self.frames = None
+        try:
+            self.shm.close()
+        except Exception:
+            pass
+
+    def unlink(self):
+        try:
+            self.shm.unlink()
+        except FileNotFoundError:
+            pass
+
+
+class SharedFrameSource:
+    """Reader side of a camera ring with the CameraStream frame interface used by FrameProcessor.
+
+    Frames are copied out of the ring into a local pool, and a copy is only handed out if the writer
+    did not start rewriting its slot during the copy, so readers never see a torn frame.
+    """
+
+    def __init__(self, name, shape, slots=4, condition=None, poll_interval=0.005, pool_size=4):
+        self.ring = SharedFrameRing(name, shape, slots)
+        self.condition = condition  # only shareable with processes started after it was created
+        self.poll_interval = poll_interval
+        self.pool = FramePool(pool_size)
+        self.pool.configure(self.ring.shape)
+
+    def has_frame(self):
+        return self.ring.frame_id > 0
+
+    def latest_frame_id(self):
+        return self.ring.frame_id
+
+    def latest(self):
+        # (frame_id, buffer, timestamp) with a private copy of the newest frame, buffer None if there is
+        # none or every attempt was lapped by the writer; the caller releases the buffer
+        for _ in range(3):
+            latest = self.ring.latest()
+            if latest is None:
+                break
+            frame_id, slot, timestamp = latest
+            buffer = self.pool.get() or FrameBuffer(None, np.empty(self.ring.shape, np.uint8))
+            np.copyto(buffer.array, self.ring.frames[slot])
+            if self.ring.slot_frame_id(slot) == frame_id:
+                return frame_id, buffer, timestamp
+            buffer.release()
+            self.ring.header[TORN] += 1
+        return self.ring.frame_id, None, 0.0
+
+    def wait_frame(self, after_id, timeout=1.0):
+        if self.condition is not None:
+            with self.condition:
+                self.condition.wait_for(lambda: self.ring.frame_id > after_id, timeout=timeout)
+        else:
+            deadline = time.time() + (timeout or 0)
+            while self.ring.frame_id <= after_id and time.time() < deadline:
+                time.sleep(self.poll_interval)
+        return self.latest()
+
+    def close(self):
+        self.ring.close()
+        self.pool.close()
+
+
+def capture_main(camera_index, name, slots, ready, stop, condition, detect_fps=10, preview_fps=30, buffer_size=1):
+    # Capture process: grab every frame, decode the ones due straight into the next ring slot
+    cap = cv2.VideoCapture(camera_index)
+    cap.set(cv2.CAP_PROP_BUFFERSIZE, buffer_size)
+    ret, frame = cap.read() if cap.isOpened() else (False, None)
+    if not ret:
+        cap.release()
+        ready.put(None)
+        return
+
+    ring = SharedFrameRing(name, frame.shape, slots, create=True)
+    slot, buf = ring.next_slot()
+    buf[...] = frame
+    ring.commit(slot, time.time())
+    ring.header[STATUS] = STATUSES.index("RUNNING")
+    ready.put(frame.shape)
+
+    prev_frame_time = last_decode_time = time.time()
+    try:
+        while not stop.is_set():
+            if not cap.grab():
+                ring.header[STATUS] = STATUSES.index("ERROR")
+                logger.error(f"Failed to read frame from camera {camera_index}")
+                time.sleep(1)
+                continue
+            ring.header[STATUS] = STATUSES.index("RUNNING")
+            ring.header[GRABBED] += 1
+            now = time.time()
+            ring.header[FPS] = 1 / (now - prev_frame_time) if now > prev_frame_time else 0
+            prev_frame_time = now
+
+            rates = [detect_fps] + ([preview_fps] if ring.header[VIEWERS] > 0 else [])
+            if min(rates) > 0 and now - last_decode_time < 1 / max(rates):
+                continue
+            slot, buf = ring.next_slot()
+            ret, frame = cap.retrieve(buf)
+            if not ret:
+                continue
+            if frame is not buf:
+                # Resolution changed mid-stream, keep the ring's shape
+                buf[...] = cv2.resize(frame, (buf.shape[1], buf.shape[0]))
+            last_decode_time = now
+            ring.header[DECODED] += 1
+            ring.commit(slot, now)
+            with condition:
+                condition.notify_all()
+    finally:
+        ring.header[STATUS] = STATUSES.index("STOPPED")
+        cap.release()
+        ring.close()
+        ring.unlink()
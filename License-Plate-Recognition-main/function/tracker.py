@@ -0,0 +1,142 @@
+import time
+import numpy as np
+
+def box_iou(a, b):
+    # IoU matrix between (n, 4) and (m, 4) xyxy boxes
+    a = np.asarray(a, dtype=np.float64).reshape(-1, 4)
+    b = np.asarray(b, dtype=np.float64).reshape(-1, 4)
+    lt = np.maximum(a[:, None, :2], b[None, :, :2])
+    rb = np.minimum(a[:, None, 2:], b[None, :, 2:])
+    inter = np.clip(rb - lt, 0, None).prod(2)
+    area_a = (a[:, 2] - a[:, 0]) * (a[:, 3] - a[:, 1])
+    area_b = (b[:, 2] - b[:, 0]) * (b[:, 3] - b[:, 1])
+    return inter / np.maximum(area_a[:, None] + area_b[None, :] - inter, 1e-9)
+
+class Track:
+    """One plate followed across frames"""
+
+    def __init__(self, track_id, bbox, confidence, now):
+        self.id = track_id
+        self.bbox = bbox  # [xmin, ymin, xmax, ymax]
+        self.confidence = confidence
+        self.hits = 1
+        self.misses = 0
+        self.first_seen = now
+        self.last_seen = now
+        self.plate = None
+        self.plate_confidence = 0.0
+        self.agreement = 0.0
+        self.ocr_attempts = 0
+        self.readings = {}  # plate length -> number of readings with that length
+        self.votes = {}  # plate length -> per-position {char: summed weight}
+        self.stable = False
+        self.unresolved = False  # max_readings reached without consensus, no plate is emitted
+        self.emitted = False  # plate event already published for this track
+
+    def add_reading(self, plate, score, char_confs=None, min_readings=3, agreement=0.6, max_readings=10):
+        # Character-position voting across frames, each character weighted by its OCR and box confidence.
+        # The plate is stable once min_readings agree on every position by at least the agreement fraction.
+        # After max_readings successful readings without that the track is closed as unresolved; "unknown"
+        # readings (plate still too far away, glare) do not count, so the track keeps being read.
+        self.ocr_attempts += 1
+        if plate != "unknown":
+            if not char_confs or len(char_confs) != len(plate):
+                char_confs = [score] * len(plate)
+            n = len(plate)
+            self.readings[n] = self.readings.get(n, 0) + 1
+            positions = self.votes.setdefault(n, [{} for _ in range(n)])
+            for counts, char, conf in zip(positions, plate, char_confs):
+                counts[char] = counts.get(char, 0.0) + conf * self.confidence
+            self.plate_confidence = max(self.plate_confidence, score)
+            self._consensus()
+
+        if self.plate is not None and self.readings[len(self.plate)] >= min_readings and self.agreement >= agreement:
+            self.stable = True
+        elif sum(self.readings.values()) >= max_readings:
+            self.unresolved = True
+
+    def _consensus(self):
+        # Length with the most total weight wins, then the heaviest character per position
+        n = max(self.votes, key=lambda k: sum(sum(counts.values()) for counts in self.votes[k]))
+        chars = []
+        agreement = 1.0
+        for counts in self.votes[n]:
+            char = max(counts, key=counts.get)
+            chars.append(char)
+            agreement = min(agreement, counts[char] / max(sum(counts.values()), 1e-9))
+        self.plate = "".join(chars)
+        self.agreement = agreement
+
+    def needs_ocr(self):
+        return not self.stable and not self.unresolved
+
+class PlateTracker:
+    """Greedy IoU tracker with a centroid-distance fallback, run once per detection cycle"""
+
+    def __init__(self, iou_threshold=0.3, max_distance=1.0, max_misses=5, min_readings=3, agreement=0.6, max_readings=10):
+        self.iou_threshold = iou_threshold
+        self.max_distance = max_distance  # centroid fallback, in multiples of the track's box diagonal
+        self.max_misses = max_misses  # detection cycles a track survives without a matching box
+        self.min_readings = min_readings  # OCR readings needed before a plate can be emitted
+        self.agreement = agreement  # minimum per-position vote share for the consensus plate
+        self.max_readings = max_readings  # stop OCR on a track after this many readings without consensus
+        self.tracks = []
+        self.next_id = 1
+
+    def _match(self, boxes):
+        matches = {}
+        if not self.tracks or not boxes:
+            return matches
+        track_boxes = [t.bbox for t in self.tracks]
+        iou = box_iou(track_boxes, boxes)
+
+        # IoU pass, best pairs first
+        for ti, bi in zip(*np.unravel_index(np.argsort(-iou, axis=None), iou.shape)):
+            if iou[ti, bi] < self.iou_threshold:
+                break
+            if ti not in matches and bi not in matches.values():
+                matches[ti] = bi
+
+        # Centroid pass for fast movers whose boxes no longer overlap
+        tb = np.asarray(track_boxes, dtype=np.float64)
+        bb = np.asarray(boxes, dtype=np.float64)
+        tc = (tb[:, :2] + tb[:, 2:]) / 2
+        bc = (bb[:, :2] + bb[:, 2:]) / 2
+        dist = np.linalg.norm(tc[:, None] - bc[None], axis=2)
+        limit = np.linalg.norm(tb[:, 2:] - tb[:, :2], axis=1) * self.max_distance
+        for ti, bi in zip(*np.unravel_index(np.argsort(dist, axis=None), dist.shape)):
+            if ti not in matches and bi not in matches.values() and dist[ti, bi] <= limit[ti]:
+                matches[ti] = bi
+        return matches
+
+    def add_reading(self, track, plate, score, char_confs=None):
+        track.add_reading(plate, score, char_confs, self.min_readings, self.agreement, self.max_readings)
+
+    def update(self, boxes, confidences, now=None):
+        # Returns the track for each input box, in input order
+        now = time.time() if now is None else now
+        boxes = [list(map(float, b)) for b in boxes]
+        matches = self._match(boxes)
+        assigned = [None] * len(boxes)
+        for ti, bi in matches.items():
+            track = self.tracks[ti]
+            track.bbox = boxes[bi]
+            track.confidence = float(confidences[bi])
+            track.hits += 1
+            track.misses = 0
+            track.last_seen = now
+            assigned[bi] = track
+
+        matched = set(matches)
+        for ti, track in enumerate(self.tracks):
+            if ti not in matched:
+                track.misses += 1
+        self.tracks = [t for t in self.tracks if t.misses <= self.max_misses]
+
+        for bi, box in enumerate(boxes):
+            if assigned[bi] is None:
+                track = Track(self.next_id, box, float(confidences[bi]), now)
+                self.next_id += 1
+                self.tracks.append(track)
+                assigned[bi] = track
+        return assigned
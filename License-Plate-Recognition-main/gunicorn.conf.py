@@ -0,0 +1,57 @@
+# Production serving: gunicorn -c gunicorn.conf.py (SERVICE=api, the default) or SERVICE=stream
+#
+# api:    the master imports api.py once (preload_app), loading and warming up the models, then forks
+#         one worker per core that share the weights copy-on-write. Each worker accepts WEB_THREADS
+#         concurrent requests into its admission queue, which orders and sheds them. Workers are
+#         recycled after MAX_REQUESTS requests (with jitter so they do not all restart together).
+# stream: cameras, processors and results live in the process that started them, so the stream API
+#         runs as a single worker with a thread per connection; use STREAM_MODE=multiprocess to spread
+#         inference over cores. It is never recycled, that would stop every camera.
+import gc
+import multiprocessing
+import os
+
+import torch
+
+SERVICE = os.getenv('SERVICE', 'api')
+CORES = multiprocessing.cpu_count()
+
+if SERVICE == 'stream':
+    wsgi_app = 'stream_api:app'
+    bind = os.getenv('BIND', '0.0.0.0:4051')
+    workers = 1
+    worker_class = 'gthread'
+    threads = int(os.getenv('WEB_THREADS', 32))  # each MJPEG viewer and /events client holds a thread
+    max_requests = 0
+    timeout = 0  # streaming responses never finish
+else:
+    wsgi_app = 'api:app'
+    bind = os.getenv('BIND', '0.0.0.0:4050')
+    workers = int(os.getenv('WEB_WORKERS', 0)) or CORES
+    worker_class = 'gthread'
+    # Connections per worker, above the admission queue sizes so overload is shed with 503s
+    # instead of waiting unseen in the listen backlog
+    threads = int(os.getenv('WEB_THREADS', 48))
+    max_requests = int(os.getenv('MAX_REQUESTS', 1000))
+    max_requests_jitter = max(1, max_requests // 10)
+    timeout = int(os.getenv('WORKER_TIMEOUT', 120))
+
+preload_app = True
+graceful_timeout = 30
+accesslog = '-'
+loglevel = os.getenv('LOG_LEVEL', 'info')
+
+# OpenMP's thread pool does not survive fork: a worker using more than one torch thread hangs if the
+# master already ran inference multi-threaded, so the master loads and warms up single-threaded
+torch.set_num_threads(1)
+
+
+def when_ready(server):
+    # Move everything loaded so far out of the garbage collector's reach, so collections in the
+    # workers do not write to (and un-share) the pages holding the preloaded models
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    # Split the cores between the workers
+    torch.set_num_threads(max(1, CORES // server.cfg.workers))
@@ -9,6 +9,7 @@ import time
 import tempfile
 import argparse
 import function.helper as helper
+import function.model_registry as model_registry
 from yolov5.models.yolo import Model  # Make sure this import path is correct
 
 ap = argparse.ArgumentParser()
@@ -16,15 +17,12 @@ ap.add_argument('-i', '--image', required=True, help='path to input image')
 args = ap.parse_args()
 
 # Then load the model
-yolo_LP_detect = torch.hub.load('yolov5', 'custom', path='model/LP_detector.pt', force_reload=True, source='local')
-yolo_license_plate = torch.hub.load('yolov5', 'custom', path='model/LP_ocr.pt', force_reload=True, source='local')
-yolo_license_plate.conf = 0.60
+yolo_LP_detect = model_registry.get_model('model/LP_detector.pt')
+yolo_license_plate = model_registry.get_model('model/LP_ocr.pt', conf=0.60)
 
 img = cv2.imread(args.image)
-plates = yolo_LP_detect(img, size=640)
-
-plates = yolo_LP_detect(img, size=640)
-list_plates = plates.pandas().xyxy[0].values.tolist()
+plates = yolo_LP_detect(img, size=640, return_raw=True)
+list_plates = plates.xyxy[0].tolist()
 list_read_plates = set()
 if len(list_plates) == 0:
     lp = helper.read_plate(yolo_license_plate,img)
@@ -8,5 +8,9 @@ fi
 # Install Flask if not already installed
 pip install flask
 
-# Start the API
+# Start the API, PRODUCTION=1 serves it with gunicorn (preloaded models, one worker per core)
+if [ "$PRODUCTION" = "1" ]; then
+    pip install "gunicorn>=20.1"
+    exec gunicorn -c gunicorn.conf.py
+fi
 python api.py
@@ -8,5 +8,9 @@ fi
 # Install required packages
 pip install flask flask-cors
 
-# Start the streaming API
+# Start the streaming API, PRODUCTION=1 serves it with gunicorn
+if [ "$PRODUCTION" = "1" ]; then
+    pip install "gunicorn>=20.1"
+    SERVICE=stream exec gunicorn -c gunicorn.conf.py
+fi
 python stream_api.py
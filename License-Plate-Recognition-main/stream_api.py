@@ -4,14 +4,24 @@ import torch
 import time
 import threading
 import queue
-import numpy as np
-import function.utils_rotate as utils_rotate
+import multiprocessing
 import function.helper as helper
+import function.model_registry as model_registry
+from function.batch_scheduler import BatchScheduler
+from function.motion import MotionGate
+from function.tracker import PlateTracker
+from function.event_bus import EventBus
+from function.frame_encoder import FrameEncoder
+from function.frame_bus import FrameBus, DropPolicy
+from function.frame_pool import FramePool, MemoryBudget
+from function.process_pool import InferenceWorkerPool
+from function.lane_scheduler import LaneScheduler
+import function.shm_ring as shm_ring
 from flask_cors import CORS
 import json
+import base64
 import os
 import logging
-import tempfile
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
@@ -29,20 +39,92 @@ CORS(app, resources={
 # Global variables
 camera_streams = {}
 detection_results = {}
-frame_queues = {}
+detection_versions = {}  # camera_id -> detection_seq of its last plate change (or removal)
+detection_seq = 0
+result_versions = {}  # camera_id -> count of results stored, part of the annotated JPEG cache key
+detection_lock = threading.Lock()
 processing_threads = {}
 camera_statuses = {}
 performance_metrics = {}
+detection_schedulers = {}
+detection_schedulers_lock = threading.Lock()
+
+# Plate events pushed to /events subscribers
+EVENT_BUFFER_SIZE = int(os.getenv('EVENT_BUFFER_SIZE', 1000))
+EVENT_HEARTBEAT = float(os.getenv('EVENT_HEARTBEAT', 15))  # seconds between keep-alive comments
+event_bus = EventBus(EVENT_BUFFER_SIZE)
+
+# JPEG quality shared by /stream, /frame and /raw-frame so one encode serves them all
+JPEG_QUALITY = int(os.getenv('JPEG_QUALITY', 95))
+
+# Reusable frame buffers per camera, capped service-wide (0 = no cap)
+FRAME_POOL_SIZE = int(os.getenv('FRAME_POOL_SIZE', 4))
+FRAME_MEMORY_BUDGET_MB = float(os.getenv('FRAME_MEMORY_BUDGET_MB', 0))
+frame_memory = MemoryBudget(int(FRAME_MEMORY_BUDGET_MB * 1024 ** 2))
+
+# Keys accepted in a start request's "capture" config, passed to the CameraStream constructor
+CAPTURE_KEYS = ('detect_fps', 'preview_fps', 'buffer_size', 'pool_size')
+
+# 'thread' runs everything in this process, 'multiprocess' runs capture and inference in child processes
+STREAM_MODE = os.getenv('STREAM_MODE', 'thread')
+# Lane worker threads in thread mode (default one per core). In multiprocess mode it is the number of
+# inference processes (default 1): each one loads its own detector and OCR models and torch runtime,
+# a few hundred MB of RSS per process, so raise it only as far as cores and memory allow
+INFERENCE_WORKERS = int(os.getenv('INFERENCE_WORKERS', 0)) or None
+inference_pool = None
+lane_scheduler = None
+lane_scheduler_lock = threading.Lock()
+
+# Cross-camera detection batching
+DETECTION_MAX_BATCH = int(os.getenv('DETECTION_MAX_BATCH', 8))
+DETECTION_MAX_WAIT = float(os.getenv('DETECTION_MAX_WAIT', 0.02))  # seconds
+
+def get_lane_scheduler():
+    # K workers serve every camera in this process (K = INFERENCE_WORKERS, default one per core).
+    # They do not run the models in parallel: detection goes through the single BatchScheduler thread
+    # and OCR calls are serialized by the shared model's lock, so at most a detector batch and an OCR
+    # call run at once and the cores are split between those two, not between the K workers
+    global lane_scheduler
+    with lane_scheduler_lock:
+        if lane_scheduler is None:
+            lane_scheduler = LaneScheduler(INFERENCE_WORKERS)
+            torch.set_num_threads(max(1, (os.cpu_count() or 1) // 2))
+            lane_scheduler.start()
+        return lane_scheduler
+
+def get_detection_scheduler(model_path_detector):
+    # One scheduler per detector weights file, shared by every camera using it
+    with detection_schedulers_lock:
+        scheduler = detection_schedulers.get(model_path_detector)
+        if scheduler is None:
+            scheduler = BatchScheduler(model_registry.get_model(model_path_detector),
+                                       max_batch_size=DETECTION_MAX_BATCH,
+                                       max_wait=DETECTION_MAX_WAIT,
+                                       max_concurrency=get_lane_scheduler().workers)
+            scheduler.start()
+            detection_schedulers[model_path_detector] = scheduler
+        return scheduler
 
 # Camera stream class
 class CameraStream:
-    def __init__(self, camera_id, camera_index=0):
+    def __init__(self, camera_id, camera_index=0, detect_fps=10, preview_fps=30, buffer_size=1, pool_size=FRAME_POOL_SIZE):
         self.camera_id = camera_id
         self.camera_index = camera_index
         self.status = "INITIALIZING"
         self.cap = None
-        self.frame_queue = queue.Queue(maxsize=10)
-        self.last_frame = None
+
+        # Decode schedule: every frame is grabbed, but only decoded at these rates (0 = every frame)
+        self.detect_fps = detect_fps  # decodes feeding the detector
+        self.preview_fps = preview_fps  # extra decodes while someone is watching /stream
+        self.buffer_size = buffer_size  # driver-side frame buffer, small so grabs stay fresh
+        self.viewers_lock = threading.Lock()
+        self.viewers = 0
+        self.last_decode_time = 0
+        self.frames_grabbed = 0
+        self.frames_decoded = 0
+        self.pool = FramePool(pool_size, frame_memory)  # frames are decoded into reused buffers
+        self.bus = FrameBus()  # latest frame + ID, wakes stream viewers on every new frame
+        self.encoder = FrameEncoder(JPEG_QUALITY)
         self.fps = 0
         self.prev_frame_time = 0
         self.new_frame_time = 0
@@ -59,6 +141,7 @@ class CameraStream:
                 self.status = "ERROR"
                 logger.error(f"Failed to open camera {self.camera_id}")
                 return False
+            self.cap.set(cv2.CAP_PROP_BUFFERSIZE, self.buffer_size)  # ignored by backends without a buffer
 
             self.status = "RUNNING"
             self.running = True
@@ -71,160 +154,548 @@ class CameraStream:
             logger.error(f"Error starting camera {self.camera_id}: {str(e)}")
             return False
 
+    def _decode_interval(self):
+        # Fastest rate anyone currently needs decoded frames at
+        rates = [self.detect_fps]
+        if self.viewers > 0:
+            rates.append(self.preview_fps)
+        if min(rates) <= 0:
+            return 0
+        return 1 / max(rates)
+
     def _update(self):
         while self.running:
             try:
-                ret, frame = self.cap.read()
+                # Grab keeps the driver buffer drained, decoding is only paid for frames someone will use
+                ret = self.cap.grab()
                 if not ret:
                     self.status = "ERROR"
                     logger.error(f"Failed to read frame from camera {self.camera_id}")
                     time.sleep(1)
                     continue
+                self.frames_grabbed += 1
 
-                # Calculate FPS
+                # Calculate FPS (camera rate, counted on grabs)
                 self.new_frame_time = time.time()
                 self.fps = 1 / (self.new_frame_time - self.prev_frame_time) if (self.new_frame_time - self.prev_frame_time) > 0 else 0
                 self.prev_frame_time = self.new_frame_time
 
-                # Update performance metrics
+                if self.new_frame_time - self.last_decode_time < self._decode_interval():
+                    continue
+                buffer = self._retrieve()
+                if buffer is None:
+                    continue
+                self.last_decode_time = self.new_frame_time
+                self.frames_decoded += 1
+
+                # Update performance metrics (keep keys written by the frame processor)
                 global performance_metrics
-                performance_metrics[self.camera_id] = {
+                performance_metrics.setdefault(self.camera_id, {}).update({
                     "timestamp": time.time(),
                     "fps": round(self.fps, 2),
-                    "queue_size": self.frame_queue.qsize(),
-                    "status": self.status
-                }
-
-                # Put frame in queue, discard if queue is full
-                if not self.frame_queue.full():
-                    self.frame_queue.put(frame)
-                self.last_frame = frame
+                    "status": self.status,
+                    "frames_grabbed": self.frames_grabbed,
+                    "frames_decoded": self.frames_decoded,
+                    **self.pool.stats(),
+                    **self.encoder.stats()
+                })
+
+                # Freshest frame wins, the detector never reads a backlog of stale frames
+                self.bus.publish(buffer, self.new_frame_time)
             except Exception as e:
                 self.status = "ERROR"
                 logger.error(f"Error in camera {self.camera_id} update loop: {str(e)}")
                 time.sleep(1)
 
-    def get_frame(self):
-        if self.last_frame is None:
+    def _retrieve(self):
+        # Decode the grabbed frame into a free pool buffer, the first frame (or a resolution change) sizes the pool
+        buffer = self.pool.get() if self.pool.shape is not None else None
+        if self.pool.shape is not None and buffer is None:
+            return None  # every buffer is still referenced by a consumer, drop this frame
+        ret, frame = self.cap.retrieve(buffer.array) if buffer is not None else self.cap.retrieve()
+        if not ret:
+            if buffer is not None:
+                buffer.release()
+            self.status = "ERROR"
+            logger.error(f"Failed to decode frame from camera {self.camera_id}")
+            time.sleep(1)
             return None
-        return self.last_frame
+        if buffer is not None and frame is buffer.array:
+            return buffer
+        if buffer is not None:
+            buffer.release()
+        self.pool.configure(frame.shape, frame.dtype)
+        buffer = self.pool.get()
+        buffer.array[...] = frame
+        return buffer
+
+    def latest_frame(self):
+        # (frame_id, buffer, timestamp) of the newest frame, the caller releases the buffer
+        return self.bus.latest()
+
+    def has_frame(self):
+        return self.bus.frame_id > 0
+
+    def latest_frame_id(self):
+        return self.bus.frame_id
+
+    def wait_frame(self, after_id, timeout=1.0):
+        # Block until a frame newer than after_id is captured, returns (frame_id, buffer, timestamp)
+        # and the caller must release the buffer
+        return self.bus.wait(after_id, timeout)
+
+    def add_viewers(self, delta):
+        # /stream handlers join and leave from concurrent request threads
+        with self.viewers_lock:
+            self.viewers += delta
+
+    def get_jpeg(self, annotated=True, frame_id=None, frame=None):
+        # Cached JPEG of the latest (or given) frame, encoded once however many viewers ask for it
+        if frame is None:
+            frame_id, buffer, _ = self.latest_frame()
+            if buffer is None:
+                return None
+            with buffer as frame:
+                return self.get_jpeg(annotated, frame_id, frame)
+        if not annotated:
+            return self.encoder.raw(frame_id, frame)
+        with detection_lock:
+            plates = detection_results.get(self.camera_id, {}).get("plates", [])
+            version = result_versions.get(self.camera_id, 0)
+        return self.encoder.annotated(frame_id, frame, plates, self.fps, version)
 
     def stop(self):
         self.running = False
+        self.bus.close()
         if self.thread is not None:
             self.thread.join(timeout=1.0)
         if self.cap is not None:
             self.cap.release()
+        self.pool.close()
         self.status = "STOPPED"
         logger.info(f"Camera {self.camera_id} stopped")
 
+# Camera captured by its own process into a shared-memory ring (STREAM_MODE=multiprocess)
+class SharedCameraStream(CameraStream):
+    def __init__(self, camera_id, camera_index=0, detect_fps=10, preview_fps=30, buffer_size=1, pool_size=FRAME_POOL_SIZE):
+        self.source = None
+        super().__init__(camera_id, camera_index, detect_fps, preview_fps, buffer_size, pool_size=0)
+        self.ring_name = f"lpr_{os.getpid()}_{''.join(c if c.isalnum() else '_' for c in camera_id)}"
+        self.slots = max(3, pool_size)  # ring slots the writer cycles through, readers copy frames out of them
+        self.shape = None
+        self.ctx = multiprocessing.get_context('spawn')
+        self.condition = self.ctx.Condition()  # shared with the capture process at spawn
+        self.stop_event = self.ctx.Event()
+        self.process = None
+
+    @property
+    def viewers(self):
+        return int(self.source.ring.header[shm_ring.VIEWERS]) if self.source is not None else 0
+
+    @viewers.setter
+    def viewers(self, value):
+        # The capture process raises its decode rate to preview_fps while this is non-zero
+        if self.source is not None:
+            self.source.ring.header[shm_ring.VIEWERS] = value
+
+    @property
+    def fps(self):
+        return self.source.ring.stats()["fps"] if self.source is not None else 0
+
+    @fps.setter
+    def fps(self, value):
+        pass  # measured by the capture process
+
+    def start(self):
+        if self.running:
+            return
+        ready = self.ctx.Queue()
+        self.process = self.ctx.Process(target=shm_ring.capture_main, daemon=True, args=(
+            self.camera_index, self.ring_name, self.slots, ready, self.stop_event, self.condition,
+            self.detect_fps, self.preview_fps, self.buffer_size))
+        self.process.start()
+        try:
+            self.shape = ready.get(timeout=30)
+        except queue.Empty:
+            self.shape = None
+        if self.shape is None:
+            self.status = "ERROR"
+            logger.error(f"Failed to open camera {self.camera_id}")
+            self.stop_event.set()
+            return False
+        self.source = shm_ring.SharedFrameSource(self.ring_name, self.shape, self.slots, self.condition)
+        self.status = "RUNNING"
+        self.running = True
+        logger.info(f"Camera {self.camera_id} started in capture process {self.process.pid}")
+        return True
+
+    def ring_config(self):
+        # Lets an inference worker attach to this camera's ring
+        return {"name": self.ring_name, "shape": self.shape, "slots": self.slots}
+
+    def capture_stats(self):
+        return self.source.ring.stats() if self.source is not None else {}
+
+    def latest_frame(self):
+        if self.source is None:
+            return 0, None, 0.0
+        return self.source.latest()
+
+    def has_frame(self):
+        return self.source is not None and self.source.has_frame()
+
+    def latest_frame_id(self):
+        return self.source.latest_frame_id() if self.source is not None else 0
+
+    def wait_frame(self, after_id, timeout=1.0):
+        return self.source.wait_frame(after_id, timeout)
+
+    def stop(self):
+        self.running = False
+        self.stop_event.set()
+        with self.condition:
+            self.condition.notify_all()
+        if self.process is not None:
+            self.process.join(timeout=2.0)
+        if self.source is not None:
+            self.source.close()
+        self.status = "STOPPED"
+        logger.info(f"Camera {self.camera_id} stopped")
+
+def plate_state(result):
+    # What counts as a change for /detections pollers: the plates read and their stability,
+    # not per-frame confidence, boxes or timings
+    if result is None:
+        return None
+    return [(plate.get("track_id"), plate["license_plate"], plate.get("stable")) for plate in result.get("plates", [])]
+
+def set_detection_result(camera_id, result):
+    # Store a camera's latest result (None removes it), advancing the change cursor if its plates changed
+    global detection_seq
+    with detection_lock:
+        previous = detection_results.get(camera_id)
+        result_versions[camera_id] = result_versions.get(camera_id, 0) + 1
+        if result is None:
+            detection_results.pop(camera_id, None)
+        else:
+            detection_results[camera_id] = result
+        if plate_state(previous) != plate_state(result) or camera_id not in detection_versions:
+            detection_seq += 1
+            detection_versions[camera_id] = detection_seq
+
+def publish_local(camera_id, kind, payload):
+    # Apply a frame processor's output to this process's state
+    if kind == "metrics":
+        metrics = performance_metrics.setdefault(camera_id, {})
+        metrics.update(payload)
+        camera = camera_streams.get(camera_id)
+        if isinstance(camera, SharedCameraStream):
+            metrics.update(camera.capture_stats())
+    elif kind == "result":
+        set_detection_result(camera_id, payload)
+    elif kind == "event":
+        event_bus.publish(camera_id, "plate", payload)
+
 # Frame processor class
 class FrameProcessor:
-    def __init__(self, camera_id, model_path_detector='model/LP_detector_nano_61.pt', model_path_ocr='model/LP_ocr_nano_62.pt'):
+    def __init__(self, camera_id, model_path_detector='model/LP_detector_nano_61.pt', model_path_ocr='model/LP_ocr_nano_62.pt', motion_config=None, consensus_config=None, ocr_variants=2, frame_policy=None, source=None, publish=None, min_rate=2, max_rate=5):
         self.camera_id = camera_id
+        self.source = source  # frame source, defaults to the camera_streams entry
+        self.publish = publish or publish_local  # where results, metrics and events go
         self.running = False
-        self.thread = None
+        self.scheduler = None
         self.last_detection_time = 0
-        self.detection_interval = 0.2  # seconds between detections
-
-        # Load models
+        if not 0 < min_rate <= max_rate:
+            raise ValueError(f"Invalid rates min={min_rate} max={max_rate}, expected 0 < min <= max")
+        self.min_rate = min_rate  # runs per second while the lane is idle (motion checks)
+        self.max_rate = max_rate  # runs per second cap, reached while there is motion or an open track
+
+        # Which captured frames the detector takes, and how stale they were when it did
+        self.frame_policy = DropPolicy(**(frame_policy or {}))
+        self.last_frame_id = 0
+        self.frames_dropped = 0
+
+        # Motion gate in front of the detector, motion_config=False disables it
+        self.motion_gate = MotionGate(**(motion_config or {})) if motion_config is not False else None
+
+        # Plate tracker so each vehicle is OCR'd until its readings reach consensus, not on every cycle
+        self.tracker = PlateTracker(**(consensus_config or {}))
+        self.ocr_variants = ocr_variants  # deskew variants per crop, fewer are needed with multi-frame voting
+        self.ocr_runs = 0
+        self.ocr_skipped = 0
+        self.last_result = {}  # latest published result, reused by snapshot() for the same frame
+
+        # Get shared models (loaded once per process, reused by every camera)
         try:
-            self.yolo_LP_detect = torch.hub.load('yolov5', 'custom', path=model_path_detector, force_reload=True, source='local')
-            self.yolo_license_plate = torch.hub.load('yolov5', 'custom', path=model_path_ocr, force_reload=True, source='local')
-            self.yolo_license_plate.conf = 0.60
-            logger.info(f"Models loaded for camera {camera_id}")
+            self.detection_scheduler = get_detection_scheduler(model_path_detector)
+            self.yolo_license_plate = model_registry.get_model(model_path_ocr, conf=0.60)
+            logger.info(f"Models ready for camera {camera_id}")
         except Exception as e:
             logger.error(f"Error loading models for camera {camera_id}: {str(e)}")
             raise
 
-    def start(self):
+    def start(self, scheduler=None):
         if self.running:
             return
 
+        # Lanes are run by the shared lane scheduler's workers, not a thread per camera
         self.running = True
-        self.thread = threading.Thread(target=self._process, daemon=True)
-        self.thread.start()
+        self.detection_scheduler.register()
+        self.scheduler = scheduler or get_lane_scheduler()
+        self.scheduler.add(self)
         logger.info(f"Frame processor started for camera {self.camera_id}")
 
-    def _process(self):
-        global frame_queues, detection_results, camera_streams
+    def camera(self):
+        return self.source or camera_streams.get(self.camera_id)
+
+    def motion_active(self, now=None):
+        now = time.time() if now is None else now
+        return self.motion_gate is not None and now - self.motion_gate.last_motion_time <= self.motion_gate.hold
+
+    def is_active(self, now=None):
+        # Recent motion or a vehicle still being tracked: the lane runs at max_rate
+        return self.motion_active(now) or bool(self.tracker.tracks)
+
+    def interval(self, active):
+        # Seconds between runs for the lane's state and drop policy, never faster than max_rate except
+        # during a motion burst: a 'burst' policy opts in to its own burst_interval while motion is active
+        base = 1 / self.max_rate if active else 1 / self.min_rate
+        motion_active = self.motion_active()
+        interval = self.frame_policy.interval(base, motion_active)
+        if self.frame_policy.mode == 'burst' and motion_active:
+            return interval
+        return max(interval, 1 / self.max_rate)
+
+    def frame_ready(self):
+        camera = self.camera()
+        return camera is not None and camera.latest_frame_id() >= self.frame_policy.next_frame_id(self.last_frame_id)
+
+    def watch(self, callback):
+        # Wake the scheduler when the camera publishes a frame, False if the source cannot notify
+        camera = self.camera()
+        if camera is None or not hasattr(camera, "bus"):
+            return False
+        camera.bus.subscribe(callback)
+        return True
 
-        while self.running:
-            try:
-                if self.camera_id not in frame_queues or frame_queues[self.camera_id].empty():
-                    time.sleep(0.01)
-                    continue
+    def unwatch(self, callback):
+        camera = self.camera()
+        if camera is not None and hasattr(camera, "bus"):
+            camera.bus.unsubscribe(callback)
 
-                # Check if enough time has passed since last detection
-                current_time = time.time()
-                if current_time - self.last_detection_time < self.detection_interval:
-                    time.sleep(0.01)
+    def step(self, timeout=0):
+        # Process the next frame if one is ready, returns False if there was none
+        buffer = None
+        try:
+            # Take the next frame the drop policy wants from the camera's mailbox, if it has arrived
+            camera = self.camera()
+            if camera is None:
+                return False
+            next_id = self.frame_policy.next_frame_id(self.last_frame_id)
+            frame_id, buffer, captured_at = camera.wait_frame(next_id - 1, timeout=timeout)
+            if buffer is None or frame_id < next_id:
+                return False
+            frame = buffer.array  # pooled, only valid until the buffer is released below
+            if self.last_frame_id:
+                self.frames_dropped += frame_id - self.last_frame_id - 1
+            self.last_frame_id = frame_id
+            current_time = time.time()
+            frame_age = current_time - captured_at
+
+            # Skip the detector while the lane is static
+            if self.motion_gate is not None:
+                gate_open = self.motion_gate.should_detect(frame, current_time)
+                self.publish(self.camera_id, "metrics", {
+                    **self.motion_gate.stats(),
+                    "frame_age": round(frame_age, 3),
+                    "frames_dropped": self.frames_dropped
+                })
+                if not gate_open:
+                    self.last_detection_time = current_time
+                    return True
+
+            # Process frame
+            start_time = time.time()
+            plates = self.detection_scheduler.detect(frame)
+            list_plates = plates.xyxy[0].tolist()
+            list_read_plates = []
+
+            # Match boxes to tracks, OCR only tracks without a consensus reading
+            tracks = self.tracker.update([plate[:4] for plate in list_plates], [plate[4] for plate in list_plates], current_time)
+            pending = []
+            crops = []
+            for plate, track in zip(list_plates, tracks):
+                if not track.needs_ocr():
+                    self.ocr_skipped += 1
                     continue
-
-                # Get frame from queue
-                frame = frame_queues[self.camera_id].get()
-
-                # Process frame
-                start_time = time.time()
-                plates = self.yolo_LP_detect(frame, size=640)
-                list_plates = plates.pandas().xyxy[0].values.tolist()
-                list_read_plates = []
-
-                for plate in list_plates:
-                    flag = 0
-                    x = int(plate[0])  # xmin
-                    y = int(plate[1])  # ymin
-                    w = int(plate[2] - plate[0])  # xmax - xmin
-                    h = int(plate[3] - plate[1])  # ymax - ymin
-
-                    crop_img = frame[y:y+h, x:x+w]
-
-                    for cc in range(0, 2):
-                        for ct in range(0, 2):
-                            deskewed_img = utils_rotate.deskew(crop_img, cc, ct)
-                            lp = helper.read_plate(self.yolo_license_plate, deskewed_img)
-                            if lp != "unknown":
-                                list_read_plates.append({
-                                    "license_plate": lp,
-                                    "confidence": float(plate[4]),
-                                    "bbox": [x, y, w, h]
-                                })
-                                flag = 1
-                                break
-                        if flag == 1:
-                            break
-
-                # Update detection results
-                detection_time = time.time() - start_time
-                detection_results[self.camera_id] = {
-                    "timestamp": time.time(),
-                    "plates": list_read_plates,
-                    "detection_time": round(detection_time, 3)
+                x = int(plate[0])  # xmin
+                y = int(plate[1])  # ymin
+                w = int(plate[2] - plate[0])  # xmax - xmin
+                h = int(plate[3] - plate[1])  # ymax - ymin
+                pending.append(track)
+                crops.append(frame[y:y+h, x:x+w])
+
+            # OCR all pending plates and their deskew variants in one batched call
+            readings = helper.read_plates(self.yolo_license_plate, crops, variants=self.ocr_variants, with_chars=True)
+            for track, (lp, score, char_confs) in zip(pending, readings):
+                self.tracker.add_reading(track, lp, score, char_confs)
+            self.ocr_runs += len(crops)
+            buffer.release()  # no frame pixels are used past this point
+            buffer = None
+
+            for plate, track in zip(list_plates, tracks):
+                if track.plate is None or track.unresolved:
+                    continue  # no reading yet, or no consensus within max_readings
+                x = int(plate[0])  # xmin
+                y = int(plate[1])  # ymin
+                result = {
+                    "track_id": track.id,
+                    "license_plate": track.plate,
+                    "confidence": float(plate[4]),
+                    "ocr_confidence": round(track.plate_confidence, 3),
+                    "agreement": round(track.agreement, 3),
+                    "stable": track.stable,
+                    "bbox": [x, y, int(plate[2] - plate[0]), int(plate[3] - plate[1])]
                 }
-
-                # Update performance metrics
-                if self.camera_id in performance_metrics:
-                    performance_metrics[self.camera_id]["detection_time"] = round(detection_time, 3)
-
-                self.last_detection_time = current_time
-
-            except Exception as e:
-                logger.error(f"Error in frame processor for camera {self.camera_id}: {str(e)}")
-                time.sleep(1)
+                list_read_plates.append(result)
+
+                # One push event per vehicle, when its plate reading settles
+                if track.stable and not track.emitted:
+                    track.emitted = True
+                    self.publish(self.camera_id, "event", result)
+
+            # Update detection results
+            detection_time = time.time() - start_time
+            self.last_result = {
+                "timestamp": time.time(),
+                "frame_id": frame_id,
+                "detected": len(list_plates),
+                "plates": list_read_plates,
+                "detection_time": round(detection_time, 3)
+            }
+            self.publish(self.camera_id, "result", self.last_result)
+
+            # Update performance metrics, decision_latency is capture to published result
+            self.publish(self.camera_id, "metrics", {
+                "detection_time": round(detection_time, 3),
+                "frame_age": round(frame_age, 3),
+                "decision_latency": round(time.time() - captured_at, 3),
+                "frames_dropped": self.frames_dropped,
+                "frame_policy": self.frame_policy.mode,
+                "tracks": len(self.tracker.tracks),
+                "ocr_runs": self.ocr_runs,
+                "ocr_skipped": self.ocr_skipped
+            })
+
+            self.last_detection_time = current_time
+            return True
+        finally:
+            if buffer is not None:
+                buffer.release()
+
+    def recognize(self, frame):
+        # One detector pass and one batched OCR call on a frame, outside the tracker
+        list_plates = self.detection_scheduler.detect(frame).xyxy[0].tolist()
+        crops = []
+        for plate in list_plates:
+            x = int(plate[0])  # xmin
+            y = int(plate[1])  # ymin
+            w = int(plate[2] - plate[0])  # xmax - xmin
+            h = int(plate[3] - plate[1])  # ymax - ymin
+            crops.append(frame[y:y+h, x:x+w])
+
+        plates = []
+        for plate, (lp, score) in zip(list_plates, helper.read_plates(self.yolo_license_plate, crops)):
+            if lp == "unknown":
+                continue
+            plates.append({
+                "license_plate": lp,
+                "confidence": float(plate[4]),
+                "ocr_confidence": round(score, 3),
+                "bbox": [int(plate[0]), int(plate[1]), int(plate[2] - plate[0]), int(plate[3] - plate[1])]
+            })
+        return plates
+
+    def snapshot(self, include_image=False):
+        # Plates on the camera's latest frame, reusing the last result when it covers that frame and every
+        # plate on it was read. Returns None if there is no frame yet
+        camera = self.camera()
+        if camera is None:
+            return None
+        frame_id, buffer, captured_at = camera.wait_frame(0, timeout=0)
+        if buffer is None:
+            return None
+        with buffer as frame:
+            result = self.last_result
+            cached = result.get("frame_id") == frame_id and len(result.get("plates", [])) == result.get("detected")
+            plates = result["plates"] if cached else self.recognize(frame)
+
+            image = None
+            if include_image and hasattr(camera, "get_jpeg"):
+                image = camera.get_jpeg(annotated=False, frame_id=frame_id, frame=frame)  # shared with /raw-frame
+            elif include_image:
+                ok, encoded = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, JPEG_QUALITY])
+                image = encoded.tobytes() if ok else None
+        return {"frame_id": frame_id, "captured_at": captured_at, "plates": plates, "cached": cached, "image": image}
 
     def stop(self):
+        if self.running:
+            self.detection_scheduler.unregister()
         self.running = False
-        if self.thread is not None:
-            self.thread.join(timeout=1.0)
+        if self.scheduler is not None:
+            self.scheduler.remove(self)  # waits for a step already running on this lane
         logger.info(f"Frame processor stopped for camera {self.camera_id}")
 
+def inference_worker(commands, results, threads=1):
+    # Inference process: attaches to camera rings and runs one FrameProcessor per assigned camera,
+    # sending results, metrics and events back to the front end
+    global lane_scheduler
+    lane_scheduler = LaneScheduler(workers=1)  # one core per worker process
+    lane_scheduler.start()
+    torch.set_num_threads(threads)
+    processors = {}
+
+    def publish(camera_id, kind, payload):
+        results.put((camera_id, kind, payload))
+
+    while True:
+        command, camera_id, config = commands.get()
+        try:
+            if command == "add":
+                source = shm_ring.SharedFrameSource(**config["ring"])
+                processor = FrameProcessor(camera_id, source=source, publish=publish, **config["processor"])
+                processor.start()
+                processors[camera_id] = processor
+            elif command == "snapshot":
+                processor = processors.get(camera_id)
+                snapshot = processor.snapshot(**config["args"]) if processor is not None else None
+                results.put((camera_id, "reply", {"id": config["id"], "result": snapshot}))
+            elif command == "remove" and camera_id in processors:
+                processor = processors.pop(camera_id)
+                processor.stop()
+                processor.source.close()
+            elif command == "stop":
+                for processor in processors.values():
+                    processor.stop()
+                break
+        except Exception as e:
+            logger.error(f"Inference worker failed to {command} camera {camera_id}: {str(e)}")
+
+def get_inference_pool():
+    global inference_pool
+    if inference_pool is None:
+        inference_pool = InferenceWorkerPool(inference_worker, INFERENCE_WORKERS or 1, on_result=publish_local)
+        inference_pool.start()
+    return inference_pool
+
 # Routes
 @app.route('/health', methods=['GET'])
 def health_check():
     return jsonify({
         "status": "ok",
         "message": "Video Stream API is running",
-        "cameras": {camera_id: camera_statuses.get(camera_id, "UNKNOWN") for camera_id in camera_streams}
+        "cameras": {camera_id: camera_statuses.get(camera_id, "UNKNOWN") for camera_id in camera_streams},
+        "frame_memory": frame_memory.stats()
     })
 
 @app.route('/cameras', methods=['GET'])
@@ -244,21 +715,52 @@ def start_camera(camera_id):
     try:
         data = request.get_json() or {}
         camera_index = data.get('camera_index', 0)
+        motion_config = data.get('motion')  # e.g. {"threshold": 0.01, "roi": [0, 0.3, 1, 1]} or false
+        consensus_config = data.get('consensus')  # e.g. {"min_readings": 3, "agreement": 0.6, "max_readings": 10}
+        ocr_variants = int(data.get('ocr_variants', 2))
+        frame_policy = data.get('frame_policy')  # e.g. {"mode": "burst", "burst_interval": 0.05} or {"mode": "every_nth", "n": 5}
+        rates = data.get('rates') or {}  # detections per second, e.g. {"min": 1, "max": 10}, a burst policy may exceed max
+        capture_config = data.get('capture') or {}  # e.g. {"detect_fps": 10, "preview_fps": 15, "buffer_size": 1}
 
         if camera_id in camera_streams:
             return jsonify({"error": f"Camera {camera_id} already exists"}), 400
 
+        if not isinstance(capture_config, dict):
+            return jsonify({"error": "capture must be an object"}), 400
+        unknown = sorted(set(capture_config) - set(CAPTURE_KEYS))
+        if unknown:
+            return jsonify({"error": f"Unknown capture keys {', '.join(unknown)}, expected {', '.join(CAPTURE_KEYS)}"}), 400
+
+        try:
+            min_rate, max_rate = float(rates.get('min', 2)), float(rates.get('max', 5))
+        except (TypeError, ValueError):
+            return jsonify({"error": "rates.min and rates.max must be numbers"}), 400
+        if not 0 < min_rate <= max_rate:
+            return jsonify({"error": "rates must satisfy 0 < min <= max"}), 400
+
+        processor_config = {
+            "motion_config": motion_config,
+            "consensus_config": consensus_config,
+            "ocr_variants": ocr_variants,
+            "frame_policy": frame_policy,
+            "min_rate": min_rate,
+            "max_rate": max_rate
+        }
+        if STREAM_MODE == 'multiprocess':
+            return start_shared_camera(camera_id, camera_index, capture_config, processor_config)
+
+        # Create frame processor first so a bad config fails before the camera is opened
+        processor = FrameProcessor(camera_id, **processor_config)
+
         # Create camera stream
-        camera = CameraStream(camera_id, camera_index)
+        camera = CameraStream(camera_id, camera_index, **capture_config)
         if not camera.start():
             return jsonify({"error": f"Failed to start camera {camera_id}"}), 500
 
         camera_streams[camera_id] = camera
         camera_statuses[camera_id] = "RUNNING"
-        frame_queues[camera_id] = camera.frame_queue
 
-        # Create and start frame processor
-        processor = FrameProcessor(camera_id)
+        # Start frame processor
         processor.start()
         processing_threads[camera_id] = processor
 
@@ -267,6 +769,25 @@ def start_camera(camera_id):
         logger.error(f"Error starting camera {camera_id}: {str(e)}")
         return jsonify({"error": str(e)}), 500
 
+def start_shared_camera(camera_id, camera_index, capture_config, processor_config):
+    # Validate the processor config here, the worker that builds the processor reports errors only to its log
+    DropPolicy(**(processor_config["frame_policy"] or {}))
+    PlateTracker(**(processor_config["consensus_config"] or {}))
+    if processor_config["motion_config"]:
+        MotionGate(**processor_config["motion_config"])
+
+    camera = SharedCameraStream(camera_id, camera_index, **capture_config)
+    if not camera.start():
+        return jsonify({"error": f"Failed to start camera {camera_id}"}), 500
+
+    camera_streams[camera_id] = camera
+    camera_statuses[camera_id] = "RUNNING"
+    processing_threads[camera_id] = get_inference_pool().add_camera(camera_id, {
+        "ring": camera.ring_config(),
+        "processor": processor_config
+    })
+    return jsonify({"message": f"Camera {camera_id} started successfully"})
+
 @app.route('/cameras/<camera_id>/stop', methods=['POST'])
 def stop_camera(camera_id):
     if camera_id not in camera_streams:
@@ -283,10 +804,8 @@ def stop_camera(camera_id):
         camera_statuses[camera_id] = "STOPPED"
 
         # Clean up
-        if camera_id in frame_queues:
-            del frame_queues[camera_id]
         if camera_id in detection_results:
-            del detection_results[camera_id]
+            set_detection_result(camera_id, None)
 
         return jsonify({"message": f"Camera {camera_id} stopped successfully"})
     except Exception as e:
@@ -299,33 +818,29 @@ def stream_camera(camera_id):
         return jsonify({"error": f"Camera {camera_id} not found"}), 404
 
     def generate():
-        while camera_id in camera_streams and camera_streams[camera_id].running:
-            frame = camera_streams[camera_id].get_frame()
-            if frame is None:
-                continue
-
-            # Draw detection results if available
-            if camera_id in detection_results:
-                for plate in detection_results[camera_id].get("plates", []):
-                    x, y, w, h = plate["bbox"]
-                    cv2.rectangle(frame, (x, y), (x+w, y+h), (0, 0, 255), 2)
-                    cv2.putText(frame, plate["license_plate"], (x, y-10), cv2.FONT_HERSHEY_SIMPLEX, 0.9, (36, 255, 12), 2)
-
-            # Draw FPS
-            fps = camera_streams[camera_id].fps
-            cv2.putText(frame, f"FPS: {int(fps)}", (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 1, (100, 255, 0), 2)
-
-            # Encode frame to JPEG
-            ret, buffer = cv2.imencode('.jpg', frame)
-            if not ret:
-                continue
-
-            frame_bytes = buffer.tobytes()
-            yield (b'--frame\r\n'
-                   b'Content-Type: image/jpeg\r\n\r\n' + frame_bytes + b'\r\n')
+        frame_id = 0
+        camera = camera_streams[camera_id]
+        camera.add_viewers(1)  # raises the camera's decode rate to preview_fps while watched
+        try:
+            while camera_id in camera_streams and camera.running:
+                # Block until a new frame is captured, never resend the same one
+                new_id, buffer, _ = camera.wait_frame(frame_id)
+                if buffer is None:
+                    continue
+                with buffer as frame:
+                    if new_id == frame_id:
+                        continue
+                    frame_id = new_id
+
+                    # Annotated JPEG shared by every viewer of this camera
+                    frame_bytes = camera.get_jpeg(annotated=True, frame_id=frame_id, frame=frame)
+                if frame_bytes is None:
+                    continue
 
-            # Limit frame rate to reduce CPU usage
-            time.sleep(0.03)  # ~30 FPS max
+                yield (b'--frame\r\n'
+                       b'Content-Type: image/jpeg\r\n\r\n' + frame_bytes + b'\r\n')
+        finally:
+            camera.add_viewers(-1)
 
     return Response(generate(), mimetype='multipart/x-mixed-replace; boundary=frame')
 
@@ -339,6 +854,66 @@ def get_detections(camera_id):
 
     return jsonify(detection_results[camera_id])
 
+@app.route('/detections', methods=['GET'])
+def get_all_detections():
+    # Plate results of every camera that changed after ?since=<seq>, a stopped camera maps to null.
+    # Poll with the returned seq; If-None-Match with the last ETag costs a bodyless 304 while nothing changed
+    try:
+        since = int(request.args.get('since', 0))
+    except ValueError:
+        return jsonify({"error": "since must be an integer sequence number"}), 400
+
+    with detection_lock:
+        head = detection_seq
+        if since > head:
+            since = 0  # cursor from before a restart, send the full state
+        # The ETag is the server's head version alone, so a poller sending back its last ETag gets a 304
+        # until anything changes, whatever cursor it sends with it
+        etag = str(head)
+        if request.if_none_match.contains(etag):
+            return Response(status=304, headers={"ETag": f'"{etag}"'})
+        cameras = {camera_id: detection_results.get(camera_id)
+                   for camera_id, version in detection_versions.items()
+                   if version > since and (since or camera_id in detection_results)}
+
+    response = jsonify({"seq": head, "cameras": cameras})
+    response.set_etag(etag)
+    return response
+
+@app.route('/events', methods=['GET'])
+def stream_events():
+    # Server-sent plate events, resumable with the Last-Event-ID header or ?since=<seq>
+    camera_id = request.args.get('camera_id')
+    since = request.headers.get('Last-Event-ID', request.args.get('since'))
+    try:
+        last_seq = int(since) if since is not None else event_bus.seq
+    except ValueError:
+        return jsonify({"error": "since must be an integer sequence number"}), 400
+
+    def generate():
+        seq = last_seq
+        yield "retry: 2000\n\n"
+
+        # Tell the client if events it missed were already dropped from the buffer,
+        # or if it is ahead of us because the service restarted and sequence numbers began again
+        oldest = event_bus.oldest_seq()
+        if seq + 1 < oldest or seq > event_bus.seq:
+            yield f"event: gap\ndata: {json.dumps({'requested': seq + 1, 'oldest_seq': oldest})}\n\n"
+            if seq > event_bus.seq:
+                seq = 0
+
+        while True:
+            events, seq = event_bus.since(seq, camera_id)
+            for event in events:
+                yield f"id: {event['seq']}\nevent: {event['type']}\ndata: {json.dumps(event)}\n\n"
+            if event_bus.wait(seq, timeout=EVENT_HEARTBEAT) == seq:
+                yield ": keep-alive\n\n"
+
+    response = Response(generate(), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
 @app.route('/cameras/<camera_id>/metrics', methods=['GET'])
 def get_metrics(camera_id):
     if camera_id not in camera_streams:
@@ -354,30 +929,16 @@ def get_camera_frame(camera_id):
     if camera_id not in camera_streams:
         return jsonify({"error": f"Camera {camera_id} not found"}), 404
 
-    frame = camera_streams[camera_id].get_frame()
-    if frame is None:
+    if not camera_streams[camera_id].has_frame():
         return jsonify({"error": "No frame available"}), 404
 
-    # Make a copy of the frame to avoid modifying the original
-    frame_copy = frame.copy()
-
-    # Draw detection results if available
-    if camera_id in detection_results:
-        for plate in detection_results[camera_id].get("plates", []):
-            x, y, w, h = plate["bbox"]
-            cv2.rectangle(frame_copy, (x, y), (x+w, y+h), (0, 0, 255), 2)
-            cv2.putText(frame_copy, plate["license_plate"], (x, y-10), cv2.FONT_HERSHEY_SIMPLEX, 0.9, (36, 255, 12), 2)
-
-            # Log detection for debugging
-            print(f"Camera {camera_id} detected license plate: {plate['license_plate']} at {x},{y},{w},{h}")
-
-    # Encode frame to JPEG with high quality
-    ret, buffer = cv2.imencode('.jpg', frame_copy, [cv2.IMWRITE_JPEG_QUALITY, 95])
-    if not ret:
+    # Annotated JPEG, shared with /stream viewers of the same frame
+    frame_bytes = camera_streams[camera_id].get_jpeg(annotated=True)
+    if frame_bytes is None:
         return jsonify({"error": "Failed to encode frame"}), 500
 
     # Add CORS headers
-    response = Response(buffer.tobytes(), mimetype='image/jpeg')
+    response = Response(frame_bytes, mimetype='image/jpeg')
     response.headers.add('Access-Control-Allow-Origin', '*')
     return response
 
@@ -387,24 +948,68 @@ def get_raw_camera_frame(camera_id):
     if camera_id not in camera_streams:
         return jsonify({"error": f"Camera {camera_id} not found"}), 404
 
-    frame = camera_streams[camera_id].get_frame()
-    if frame is None:
+    if not camera_streams[camera_id].has_frame():
         return jsonify({"error": "No frame available"}), 404
 
-    # Encode frame to JPEG with high quality
-    ret, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, 95])
-    if not ret:
+    # Raw JPEG, encoded once per captured frame
+    frame_bytes = camera_streams[camera_id].get_jpeg(annotated=False)
+    if frame_bytes is None:
         return jsonify({"error": "Failed to encode frame"}), 500
 
     # Add CORS headers
-    response = Response(buffer.tobytes(), mimetype='image/jpeg')
+    response = Response(frame_bytes, mimetype='image/jpeg')
     response.headers.add('Access-Control-Allow-Origin', '*')
     return response
 
+@app.route('/cameras/<camera_id>/recognize', methods=['POST'])
+def recognize_camera_frame(camera_id):
+    """Recognize plates on the camera's latest frame in memory, for manual gate snapshots"""
+    if camera_id not in camera_streams:
+        return jsonify({"success": False, "error": f"Camera {camera_id} not found"}), 404
+    processor = processing_threads.get(camera_id)
+    if processor is None:
+        return jsonify({"success": False, "error": f"Camera {camera_id} has no frame processor"}), 404
+
+    try:
+        # Runs on the camera's own processor and models, in an inference worker in multiprocess mode
+        include_image = request.args.get('image', 'false').lower() in ('1', 'true', 'yes')
+        snapshot = processor.snapshot(include_image=include_image)
+        if snapshot is None:
+            return jsonify({"success": False, "error": "No frame available"}), 404
+
+        plates = snapshot["plates"]
+        best = max(plates, key=lambda plate: plate.get("ocr_confidence", 0), default=None)
+        response = {
+            "success": True,
+            "licensePlate": best["license_plate"] if best else "Unknown",
+            "plates": plates,
+            "frame_id": snapshot["frame_id"],
+            "captured_at": snapshot["captured_at"],
+            "cached": snapshot["cached"]
+        }
+        if snapshot["image"] is not None:
+            response["image"] = base64.b64encode(snapshot["image"]).decode('ascii')
+        return jsonify(response)
+    except TimeoutError:
+        return jsonify({"success": False, "error": "Inference worker did not answer in time"}), 504
+    except Exception as e:
+        logger.error(f"Error recognizing frame from camera {camera_id}: {str(e)}")
+        return jsonify({"success": False, "error": str(e)}), 500
+
 @app.route('/metrics', methods=['GET'])
 def get_all_metrics():
     return jsonify(performance_metrics)
 
+@app.route('/models', methods=['GET'])
+def get_models():
+    return jsonify({
+        "models": model_registry.registry.stats(),
+        "schedulers": {path: scheduler.stats() for path, scheduler in detection_schedulers.items()},
+        "events": event_bus.stats(),
+        "workers": inference_pool.stats() if inference_pool is not None else None,
+        "lanes": lane_scheduler.stats() if lane_scheduler is not None else None
+    })
+
 # Initialize default cameras
 def init_cameras():
     # Initialize entry cameras
@@ -415,7 +1020,6 @@ def init_cameras():
             if camera.start():
                 camera_streams[camera_id] = camera
                 camera_statuses[camera_id] = "RUNNING"
-                frame_queues[camera_id] = camera.frame_queue
 
                 # Create and start frame processor
                 processor = FrameProcessor(camera_id)
@@ -433,5 +1037,5 @@ if __name__ == '__main__':
     # Uncomment to auto-start cameras
     # init_cameras()
 
-    # Start the Flask app
-    app.run(host='0.0.0.0', port=4051, debug=True, threaded=True)
+    # Start the Flask development server, production runs under gunicorn (SERVICE=stream, see gunicorn.conf.py)
+    app.run(host='0.0.0.0', port=4051, debug=os.getenv('FLASK_DEBUG') == '1', threaded=True)
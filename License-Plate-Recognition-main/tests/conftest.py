@@ -0,0 +1,8 @@
+import os
+import sys
+
+# Tests import the app modules (api, stream_api, function.*) from the project root
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for path in (ROOT, os.path.join(ROOT, 'yolov5')):
+    if path not in sys.path:
+        sys.path.insert(0, path)
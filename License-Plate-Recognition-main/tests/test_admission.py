@@ -0,0 +1,95 @@
+import threading
+import time
+
+import pytest
+
+from function.admission import AdmissionQueue, Overloaded
+
+
+def hold(queue, priority, entered, release):
+    # Occupy the single model slot until release is set
+    with queue.admit(priority, time.time() + 10):
+        entered.set()
+        release.wait(5)
+
+
+def test_interactive_runs_before_queued_bulk():
+    queue = AdmissionQueue({"interactive": 4, "bulk": 4}, concurrency=1, service_time=0.01)
+    entered, release = threading.Event(), threading.Event()
+    holder = threading.Thread(target=hold, args=(queue, "bulk", entered, release))
+    holder.start()
+    entered.wait(5)
+
+    order = []
+
+    def request(priority):
+        with queue.admit(priority, time.time() + 10):
+            order.append(priority)
+
+    waiters = [threading.Thread(target=request, args=("bulk",)) for _ in range(2)]
+    for thread in waiters:
+        thread.start()
+    while queue.stats()["classes"]["bulk"]["depth"] < 2:
+        time.sleep(0.005)
+    waiters.append(threading.Thread(target=request, args=("interactive",)))
+    waiters[-1].start()
+    while queue.stats()["classes"]["interactive"]["depth"] < 1:
+        time.sleep(0.005)
+
+    release.set()
+    for thread in [holder] + waiters:
+        thread.join(5)
+    assert order == ["interactive", "bulk", "bulk"]
+
+
+def test_full_class_queue_is_rejected_with_retry_after():
+    queue = AdmissionQueue({"interactive": 1, "bulk": 1}, concurrency=1, service_time=0.01)
+    entered, release = threading.Event(), threading.Event()
+    holder = threading.Thread(target=hold, args=(queue, "bulk", entered, release))
+    holder.start()
+    entered.wait(5)
+    waiter = threading.Thread(target=hold, args=(queue, "bulk", threading.Event(), release))
+    waiter.start()
+    while queue.stats()["classes"]["bulk"]["depth"] < 1:
+        time.sleep(0.005)
+
+    with pytest.raises(Overloaded) as e:
+        queue.check("bulk")
+    assert e.value.retry_after >= 1
+    queue.check("interactive")  # other classes are unaffected
+
+    release.set()
+    holder.join(5)
+    waiter.join(5)
+    assert queue.stats()["classes"]["bulk"]["rejected"] == 1
+
+
+def test_deadline_that_cannot_be_met_is_rejected_up_front():
+    queue = AdmissionQueue({"interactive": 4}, concurrency=1, service_time=5.0)
+    entered, release = threading.Event(), threading.Event()
+    holder = threading.Thread(target=hold, args=(queue, "interactive", entered, release))
+    holder.start()
+    entered.wait(5)
+    start = time.time()
+    with pytest.raises(Overloaded):
+        with queue.admit("interactive", time.time() + 1.0):
+            pass
+    assert time.time() - start < 0.1
+    release.set()
+    holder.join(5)
+
+
+def test_request_expires_while_queued():
+    queue = AdmissionQueue({"interactive": 4}, concurrency=1, service_time=0.0)
+    entered, release = threading.Event(), threading.Event()
+    holder = threading.Thread(target=hold, args=(queue, "interactive", entered, release))
+    holder.start()
+    entered.wait(5)
+    with pytest.raises(Overloaded):
+        with queue.admit("interactive", time.time() + 0.05):
+            pass
+    release.set()
+    holder.join(5)
+    stats = queue.stats()["classes"]["interactive"]
+    assert stats["expired"] == 1
+    assert stats["depth"] == 0
@@ -0,0 +1,69 @@
+import pytest
+
+import stream_api
+
+
+@pytest.fixture
+def client():
+    stream_api.detection_results.clear()
+    stream_api.detection_versions.clear()
+    stream_api.detection_seq = 0
+    yield stream_api.app.test_client()
+    stream_api.detection_results.clear()
+    stream_api.detection_versions.clear()
+
+
+def result(plate, stable=False, confidence=0.9):
+    return {"plates": [{"track_id": 1, "license_plate": plate, "stable": stable, "confidence": confidence}]}
+
+
+def test_full_state_then_only_changed_cameras(client):
+    stream_api.set_detection_result("A", result("51A12345"))
+    stream_api.set_detection_result("B", result("29B67890"))
+    body = client.get('/detections').json
+    assert set(body["cameras"]) == {"A", "B"}
+
+    stream_api.set_detection_result("B", result("29B67890", stable=True))
+    changed = client.get(f'/detections?since={body["seq"]}').json
+    assert set(changed["cameras"]) == {"B"}
+    assert changed["seq"] > body["seq"]
+
+
+def test_confidence_only_update_is_not_a_change(client):
+    stream_api.set_detection_result("A", result("51A12345", confidence=0.5))
+    seq = client.get('/detections').json["seq"]
+    stream_api.set_detection_result("A", result("51A12345", confidence=0.7))
+    assert client.get(f'/detections?since={seq}').json == {"seq": seq, "cameras": {}}
+
+
+def test_stopped_camera_reported_as_null(client):
+    stream_api.set_detection_result("A", result("51A12345"))
+    seq = client.get('/detections').json["seq"]
+    stream_api.set_detection_result("A", None)
+    assert client.get(f'/detections?since={seq}').json["cameras"] == {"A": None}
+    assert client.get('/detections').json["cameras"] == {}
+
+
+def test_etag_returns_304_until_state_changes(client):
+    stream_api.set_detection_result("A", result("51A12345"))
+    response = client.get('/detections')
+    seq, etag = response.json["seq"], response.headers["ETag"]
+
+    # Advancing the cursor alone must not change the ETag
+    unchanged = client.get(f'/detections?since={seq}', headers={"If-None-Match": etag})
+    assert unchanged.status_code == 304
+    assert unchanged.data == b""
+
+    stream_api.set_detection_result("A", result("51A12345", stable=True))
+    changed = client.get(f'/detections?since={seq}', headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+
+
+def test_cursor_from_before_restart_gets_full_state(client):
+    stream_api.set_detection_result("A", result("51A12345"))
+    assert set(client.get('/detections?since=1000').json["cameras"]) == {"A"}
+
+
+def test_invalid_cursor_is_rejected(client):
+    assert client.get('/detections?since=abc').status_code == 400
@@ -0,0 +1,32 @@
+import time
+from types import SimpleNamespace
+
+from function.frame_bus import DropPolicy
+from stream_api import FrameProcessor
+
+
+def interval(policy, motion, active, min_rate=2, max_rate=5):
+    # Only the fields FrameProcessor.interval and its motion check read
+    gate = SimpleNamespace(last_motion_time=time.time() if motion else 0, hold=1.0)
+    lane = SimpleNamespace(frame_policy=policy, motion_gate=gate, min_rate=min_rate, max_rate=max_rate)
+    lane.motion_active = lambda now=None: FrameProcessor.motion_active(lane, now)
+    return FrameProcessor.interval(lane, active)
+
+
+def test_latest_is_capped_at_max_rate():
+    assert interval(DropPolicy('latest'), motion=True, active=True) == 1 / 5
+    assert interval(DropPolicy('latest'), motion=False, active=False) == 1 / 2
+
+
+def test_burst_exceeds_max_rate_during_motion():
+    assert interval(DropPolicy('burst', burst_interval=0.0), motion=True, active=True) == 0.0
+    assert interval(DropPolicy('burst', burst_interval=0.05), motion=True, active=True) == 0.05
+
+
+def test_burst_without_motion_follows_rates():
+    assert interval(DropPolicy('burst', burst_interval=0.0), motion=False, active=True) == 1 / 5
+    assert interval(DropPolicy('burst', burst_interval=0.0), motion=False, active=False) == 1 / 2
+
+
+def test_every_nth_is_capped_at_max_rate():
+    assert interval(DropPolicy('every_nth', n=3), motion=True, active=True) == 1 / 5
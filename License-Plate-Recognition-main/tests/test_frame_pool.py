@@ -0,0 +1,74 @@
+import numpy as np
+import pytest
+
+from function.frame_bus import FrameBus
+from function.frame_pool import FramePool, MemoryBudget
+
+SHAPE = (4, 6, 3)
+
+
+def pool(count=2, budget=None):
+    frames = FramePool(count, budget)
+    frames.configure(SHAPE)
+    return frames
+
+
+def test_buffer_is_free_only_after_last_release():
+    frames = pool()
+    bus = FrameBus()
+    buffer = frames.get()
+    bus.publish(buffer)  # the bus takes over the get() reference
+    _, lane, _ = bus.latest()
+    _, viewer, _ = bus.latest()
+    assert buffer.refs == 3
+
+    bus.publish(frames.get())  # the bus drops its reference to the old frame
+    lane.release()
+    assert buffer not in frames.free
+    viewer.release()
+    assert buffer in frames.free and buffer.refs == 0
+
+
+def test_exhausted_pool_returns_none():
+    frames = pool(count=2)
+    held = [frames.get(), frames.get()]
+    assert frames.get() is None
+    assert frames.exhausted == 1
+    held[0].release()
+    assert frames.get() is held[0]
+    assert frames.stats()["pool_exhausted"] == 1
+
+
+def test_resized_away_buffers_are_not_returned():
+    frames = pool(count=2)
+    old = frames.get()
+    frames.configure((8, 12, 3))
+    old.release()
+    assert old not in frames.free
+    assert len(frames.free) == 2
+
+    # Back to the first shape: a buffer from the old ring still does not rejoin the new one
+    stale = frames.get()
+    frames.configure(SHAPE)
+    stale.release()
+    assert stale not in frames.free
+    assert len(frames.free) == frames.allocated == 2
+
+
+def test_released_after_close_is_dropped():
+    frames = pool()
+    buffer = frames.get()
+    frames.close()
+    buffer.release()
+    assert frames.free == []
+
+
+def test_budget_shrinks_ring_and_is_freed():
+    nbytes = int(np.prod(SHAPE))
+    budget = MemoryBudget(3 * nbytes)
+    frames = pool(count=4, budget=budget)
+    assert frames.allocated == 3
+    frames.close()
+    assert budget.used == 0
+    with pytest.raises(MemoryError):
+        pool(count=4, budget=MemoryBudget(nbytes))
@@ -0,0 +1,100 @@
+import numpy as np
+import pytest
+
+from function import helper
+
+NAMES = {i: name for i, name in enumerate("0123456789ABCDEFGHKLMNPSTUVXYZ")}
+
+
+def reference_plate(bb_list):
+    # The pandas-row loop plate_from_pred replaced, kept verbatim: the .NET NormalizeLicensePlate
+    # consumer depends on exactly these strings
+    LP_type = "1"
+    if len(bb_list) == 0 or len(bb_list) < 7 or len(bb_list) > 10:
+        return "unknown"
+    center_list = []
+    y_mean = 0
+    y_sum = 0
+    for bb in bb_list:
+        x_c = (bb[0]+bb[2])/2
+        y_c = (bb[1]+bb[3])/2
+        y_sum += y_c
+        center_list.append([x_c,y_c,bb[-1]])
+
+    l_point = center_list[0]
+    r_point = center_list[0]
+    for cp in center_list:
+        if cp[0] < l_point[0]:
+            l_point = cp
+        if cp[0] > r_point[0]:
+            r_point = cp
+    for ct in center_list:
+        if l_point[0] != r_point[0]:
+            if (helper.check_point_linear(ct[0], ct[1], l_point[0], l_point[1], r_point[0], r_point[1]) == False):
+                LP_type = "2"
+
+    y_mean = int(int(y_sum) / len(bb_list))
+
+    line_1 = []
+    line_2 = []
+    license_plate = ""
+    if LP_type == "2":
+        for c in center_list:
+            if int(c[1]) > y_mean:
+                line_2.append(c)
+            else:
+                line_1.append(c)
+        for l1 in sorted(line_1, key = lambda x: x[0]):
+            license_plate += str(l1[2])
+        license_plate += "-"
+        for l2 in sorted(line_2, key = lambda x: x[0]):
+            license_plate += str(l2[2])
+    else:
+        for l in sorted(center_list, key = lambda x: x[0]):
+            license_plate += str(l[2])
+    return license_plate
+
+
+def one_line(rng):
+    n = int(rng.integers(5, 12))
+    x = np.sort(rng.uniform(0, 300, n))
+    y = rng.uniform(20, 23, n)
+    return x, y
+
+
+def two_line(rng):
+    n = int(rng.integers(7, 11))
+    top = int(rng.integers(2, n - 2))
+    x = np.concatenate([rng.uniform(0, 300, top), rng.uniform(0, 300, n - top)])
+    y = np.concatenate([rng.uniform(15, 25, top), rng.uniform(45, 60, n - top)])
+    return x, y
+
+
+def tied_x(rng):
+    # Several characters share an x center, the order between them must stay the detection order
+    n = int(rng.integers(7, 11))
+    x = rng.choice(rng.uniform(20, 300, 3), n).round()  # a center at x=0 divides by zero in the reference
+    y = rng.choice([20.0, 50.0], n) + rng.integers(0, 3, n)
+    return x, y
+
+
+def boxes(rng, centers):
+    x, y = centers
+    w, h = rng.uniform(8, 20, len(x)), rng.uniform(15, 30, len(x))
+    pred = np.stack([x - w / 2, y - h / 2, x + w / 2, y + h / 2,
+                     rng.uniform(0.25, 1.0, len(x)), rng.integers(0, len(NAMES), len(x))], axis=1)
+    return pred.astype(np.float32)  # the model's raw detections are float32
+
+
+@pytest.mark.parametrize("layout", [one_line, two_line, tied_x])
+def test_plate_from_pred_matches_reference(layout):
+    rng = np.random.default_rng(6)
+    for _ in range(5000):
+        pred = boxes(rng, layout(rng))
+        # the pandas rows the old code read: float32 values as Python floats, then the class name
+        rows = [row[:5] + [int(row[5]), NAMES[int(row[5])]] for row in pred.tolist()]
+        plate, score, char_confs = helper.plate_from_pred(pred, NAMES)
+        assert plate == reference_plate(rows)
+        if plate != "unknown":
+            assert score == pytest.approx(sum(row[4] for row in rows) / len(rows))
+            assert len(char_confs) == len(plate)
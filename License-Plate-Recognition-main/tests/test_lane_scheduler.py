@@ -0,0 +1,99 @@
+import time
+
+from function.lane_scheduler import LaneScheduler
+
+
+class Lane:
+    def __init__(self, camera_id, interval=0.01, active=False, ready=True):
+        self.camera_id = camera_id
+        self._interval = interval
+        self.active = active
+        self.ready = ready
+        self.steps = 0
+
+    def is_active(self, now=None):
+        return self.active
+
+    def interval(self, active):
+        return self._interval
+
+    def frame_ready(self):
+        return self.ready
+
+    def watch(self, callback):
+        return False
+
+    def unwatch(self, callback):
+        pass
+
+    def step(self):
+        self.steps += 1
+        return True
+
+
+class BrokenLane(Lane):
+    def interval(self, active):
+        return 1 / 0
+
+
+def test_active_lane_picked_before_equally_overdue_idle_lane():
+    scheduler = LaneScheduler(workers=1)
+    idle, active = Lane("idle"), Lane("active", active=True)
+    scheduler.add(idle)
+    scheduler.add(active)
+    now = time.time()
+    for state in scheduler.lanes.values():
+        state.last_run = now - 1.0
+    state, _ = scheduler._pick(now)
+    assert state.lane is active
+
+
+def test_most_overdue_lane_picked_first():
+    scheduler = LaneScheduler(workers=1)
+    recent, late = Lane("recent"), Lane("late")
+    scheduler.add(recent)
+    scheduler.add(late)
+    now = time.time()
+    scheduler.lanes[recent].last_run = now - 0.1
+    scheduler.lanes[late].last_run = now - 2.0
+    state, _ = scheduler._pick(now)
+    assert state.lane is late
+
+
+def test_lane_without_frame_or_not_due_is_skipped():
+    scheduler = LaneScheduler(workers=1)
+    waiting, not_due = Lane("waiting", ready=False), Lane("not_due", interval=10.0)
+    scheduler.add(waiting)
+    scheduler.add(not_due)
+    now = time.time()
+    scheduler.lanes[waiting].last_run = now - 1.0
+    state, wait = scheduler._pick(now)
+    assert state is None
+    assert wait <= scheduler.poll_interval
+
+
+def test_broken_lane_is_backed_off_and_others_keep_running():
+    scheduler = LaneScheduler(workers=2)
+    good = Lane("good")
+    scheduler.add(BrokenLane("broken"))
+    scheduler.add(good)
+    scheduler.start()
+    try:
+        time.sleep(0.3)
+    finally:
+        scheduler.stop()
+    assert good.steps > 5
+    assert all(state.backoff_until > 0 for state in scheduler.lanes.values() if state.lane is not good)
+
+
+def test_lane_runs_at_most_once_per_interval():
+    scheduler = LaneScheduler(workers=2)
+    lane = Lane("lane", interval=0.05)
+    scheduler.add(lane)
+    scheduler.start()
+    try:
+        time.sleep(0.5)
+    finally:
+        scheduler.stop()
+    assert 5 <= lane.steps <= 11
+    assert scheduler.stats()["lanes"]["lane"]["frames"] == lane.steps
@@ -0,0 +1,41 @@
+import os
+
+import pytest
+import torch
+
+from function.model_registry import ModelRegistry
+
+
+@pytest.fixture
+def registry(tmp_path):
+    weights = tmp_path / "plate.pt"
+    weights.write_bytes(b"weights")
+    return ModelRegistry(cache_dir=str(tmp_path / "cache")), str(weights)
+
+
+def write_cache(registry, weights, obj):
+    path = registry.cache_path(weights)
+    os.makedirs(registry.cache_dir, exist_ok=True)
+    if obj is None:
+        with open(path, "wb") as f:
+            f.write(b"not a pickle")
+    else:
+        torch.save(obj, path)
+
+
+@pytest.mark.parametrize("obj", [None, [1, 2], {"source": None}, {"model": "not a module"}])
+def test_unusable_cache_falls_back(registry, obj):
+    registry, weights = registry
+    write_cache(registry, weights, obj)
+    assert registry._load_cached(weights) is None
+
+
+def test_cache_round_trip_and_staleness(registry):
+    registry, weights = registry
+    model = torch.nn.Linear(2, 2)
+    registry._save_cached(weights, model)
+    assert isinstance(registry._load_cached(weights), torch.nn.Linear)
+
+    with open(weights, "ab") as f:
+        f.write(b"retrained")  # size changes, the cache no longer matches
+    assert registry._load_cached(weights) is None
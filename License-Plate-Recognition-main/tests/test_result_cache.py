@@ -0,0 +1,61 @@
+import numpy as np
+
+import function.result_cache as result_cache
+from function.image_io import perceptual_hash
+from function.result_cache import ResultCache, content_hash
+
+
+def test_lru_evicts_least_recently_used():
+    cache = ResultCache(max_entries=2, ttl=60)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1  # "b" is now least recently used
+    cache.put("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+
+
+def test_entries_expire_after_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(result_cache.time, "time", lambda: now[0])
+    cache = ResultCache(max_entries=4, ttl=10)
+    cache.put("a", "51A12345")
+    now[0] += 9
+    assert cache.get("a") == "51A12345"
+    now[0] += 2
+    assert cache.get("a") is None
+    stats = cache.stats()
+    assert stats["expirations"] == 1
+    assert stats["entries"] == 0
+
+
+def test_hit_and_miss_counters():
+    cache = ResultCache(max_entries=4, ttl=60)
+    assert cache.get("a") is None
+    cache.put("a", "Unknown")
+    assert cache.get("a") == "Unknown"
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["hit_rate"]) == (1, 1, 0.5)
+
+
+def test_zero_size_cache_stores_nothing():
+    cache = ResultCache(max_entries=0)
+    cache.put("a", 1)
+    assert cache.get("a") is None
+
+
+def test_content_hash_covers_options():
+    assert content_hash(b"image", None) == content_hash(b"image", None)
+    assert content_hash(b"image", None) != content_hash(b"image", 640)
+    assert content_hash(b"image", None) != content_hash(b"imagf", None)
+
+
+def test_perceptual_hash_survives_small_changes_only():
+    rng = np.random.default_rng(0)
+    crop = rng.integers(0, 255, (40, 120, 3), dtype=np.uint8)
+    brighter = np.clip(crop.astype(np.int16) + 3, 0, 255).astype(np.uint8)
+    other = rng.integers(0, 255, (40, 120, 3), dtype=np.uint8)
+    assert perceptual_hash(crop) == perceptual_hash(brighter)
+    assert perceptual_hash(crop) != perceptual_hash(other)
@@ -0,0 +1,76 @@
+import os
+
+import numpy as np
+import pytest
+
+import function.shm_ring as shm_ring
+from function.shm_ring import SharedFrameRing, SharedFrameSource
+
+SHAPE = (4, 6, 3)
+
+
+@pytest.fixture
+def ring():
+    writer = SharedFrameRing(f"lpr_test_{os.getpid()}", SHAPE, slots=3, create=True)
+    yield writer
+    writer.close()
+    writer.unlink()
+
+
+def write(ring, value, timestamp=1.0):
+    slot, frame = ring.next_slot()
+    frame[...] = value
+    return ring.commit(slot, timestamp)
+
+
+def test_reader_gets_a_private_copy_of_the_latest_frame(ring):
+    source = SharedFrameSource(ring.name, SHAPE, slots=3)
+    try:
+        assert not source.has_frame()
+        write(ring, 1)
+        frame_id = write(ring, 2, timestamp=5.0)
+        latest_id, buffer, timestamp = source.latest()
+        assert (latest_id, timestamp) == (frame_id, 5.0)
+        write(ring, 3)
+        write(ring, 4)  # the writer laps the slot the copy came from
+        assert (buffer.array == 2).all()
+        buffer.release()
+    finally:
+        source.close()
+
+
+def test_copy_lapped_by_the_writer_is_discarded(ring, monkeypatch):
+    source = SharedFrameSource(ring.name, SHAPE, slots=3)
+    try:
+        write(ring, 1)
+        copyto = np.copyto
+        lapped = []
+
+        def copy_while_writer_laps(dst, src):
+            copyto(dst, src)
+            if not lapped:
+                # During the first copy the writer commits two frames and starts over the copied slot
+                lapped.append(True)
+                write(ring, 2)
+                write(ring, 3)
+                ring.next_slot()
+
+        monkeypatch.setattr(shm_ring.np, "copyto", copy_while_writer_laps)
+        frame_id, buffer, _ = source.latest()
+        assert ring.stats()["torn_reads"] == 1
+        assert frame_id == 3
+        assert (buffer.array == 3).all()  # the retry copied the newest complete frame
+        buffer.release()
+    finally:
+        source.close()
+
+
+def test_wait_frame_times_out_without_new_frame(ring):
+    source = SharedFrameSource(ring.name, SHAPE, slots=3, poll_interval=0.001)
+    try:
+        frame_id = write(ring, 1)
+        new_id, buffer, _ = source.wait_frame(frame_id, timeout=0.02)
+        assert new_id == frame_id
+        buffer.release()
+    finally:
+        source.close()
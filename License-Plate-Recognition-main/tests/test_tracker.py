@@ -0,0 +1,66 @@
+from function.tracker import PlateTracker
+
+
+def new_track(tracker, box=(0, 0, 100, 40), confidence=0.9):
+    return tracker.update([box], [confidence])[0]
+
+
+def test_majority_reading_wins_per_character():
+    tracker = PlateTracker(min_readings=3, agreement=0.6)
+    track = new_track(tracker)
+    for plate in ["51A12345", "51A12345", "51A17345", "51A12345"]:
+        tracker.add_reading(track, plate, 0.9)
+    assert track.plate == "51A12345"
+    assert track.stable
+    assert not track.needs_ocr()
+
+
+def test_not_stable_before_min_readings():
+    tracker = PlateTracker(min_readings=3)
+    track = new_track(tracker)
+    tracker.add_reading(track, "51A12345", 0.9)
+    tracker.add_reading(track, "51A12345", 0.9)
+    assert track.plate == "51A12345"
+    assert not track.stable
+    assert track.needs_ocr()
+
+
+def test_character_votes_weighted_by_confidence():
+    tracker = PlateTracker(min_readings=1, agreement=0.0)
+    track = new_track(tracker)
+    tracker.add_reading(track, "51A12345", 0.9, [0.9] * 7 + [0.95])
+    tracker.add_reading(track, "51A12348", 0.9, [0.9] * 7 + [0.2])
+    tracker.add_reading(track, "51A12348", 0.9, [0.9] * 7 + [0.2])
+    assert track.plate == "51A12345"
+
+
+def test_no_consensus_within_max_readings_is_unresolved():
+    tracker = PlateTracker(min_readings=3, agreement=0.6, max_readings=4)
+    track = new_track(tracker)
+    for plate in ["51A12345", "29B67890", "30C11111", "43D22222"]:
+        tracker.add_reading(track, plate, 0.9)
+    assert track.unresolved
+    assert not track.stable
+    assert not track.needs_ocr()
+
+
+def test_unknown_readings_do_not_close_the_track():
+    tracker = PlateTracker(min_readings=2, max_readings=2)
+    track = new_track(tracker)
+    for _ in range(5):
+        tracker.add_reading(track, "unknown", 0.0)
+    assert track.plate is None
+    assert track.ocr_attempts == 5
+    assert track.needs_ocr()
+
+    tracker.add_reading(track, "51A12345", 0.9)
+    tracker.add_reading(track, "51A12345", 0.9)
+    assert track.stable and track.plate == "51A12345"
+
+
+def test_moving_box_keeps_its_track():
+    tracker = PlateTracker()
+    track = new_track(tracker, (0, 0, 100, 40))
+    assert tracker.update([(10, 2, 110, 42)], [0.9])[0] is track
+    other = tracker.update([(500, 300, 600, 340)], [0.9])[0]
+    assert other is not track
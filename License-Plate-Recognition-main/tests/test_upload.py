@@ -0,0 +1,65 @@
+import base64
+import io
+
+import pytest
+from werkzeug.exceptions import RequestEntityTooLarge
+
+import api
+
+JPEG = b'\xff\xd8\xff\xe0' + b'\x00' * 64 + b'\xff\xd9'
+
+
+def upload(**kwargs):
+    with api.app.test_request_context('/recognize', method='POST', **kwargs):
+        return api.get_upload_bytes()
+
+
+def test_raw_body():
+    assert upload(data=JPEG, content_type='image/jpeg') == (JPEG, None)
+
+
+def test_multipart_image_field():
+    assert upload(data={'image': (io.BytesIO(JPEG), 'gate.jpg')}, content_type='multipart/form-data') == (JPEG, None)
+
+
+def test_multipart_without_image_field():
+    assert upload(data={'photo': (io.BytesIO(JPEG), 'gate.jpg')}, content_type='multipart/form-data') == \
+        (None, "No image provided")
+
+
+def test_base64_json_and_data_url():
+    encoded = base64.b64encode(JPEG).decode()
+    assert upload(json={'image': encoded}) == (JPEG, None)
+    assert upload(json={'image': f'data:image/jpeg;base64,{encoded}'}) == (JPEG, None)
+
+
+def test_invalid_base64_json():
+    assert upload(json={'image': 'not base64!'}) == (None, "Invalid base64 image")
+
+
+def test_json_body_not_an_object():
+    assert upload(json=[1, 2]) == (None, "JSON body must be an object")
+    response = api.app.test_client().post('/recognize', json=[1, 2])
+    assert response.status_code == 400
+    assert response.json == {"success": False, "error": "JSON body must be an object"}
+
+
+def test_json_image_not_a_string():
+    assert upload(json={'image': 123}) == (None, "image must be a base64 string")
+    response = api.app.test_client().post('/recognize', json={'image': 123})
+    assert response.status_code == 400
+    assert response.json == {"success": False, "error": "image must be a base64 string"}
+
+
+def test_empty_body():
+    assert upload(data=b'', content_type='image/jpeg') == (None, "No image provided")
+
+
+def test_oversized_upload_rejected_before_reading(monkeypatch):
+    monkeypatch.setattr(api, 'MAX_UPLOAD_BYTES', 16)
+    with api.app.test_request_context('/recognize', method='POST', data=JPEG, content_type='image/jpeg'):
+        with pytest.raises(RequestEntityTooLarge):
+            api.get_upload_bytes()
+    response = api.app.test_client().post('/recognize', data=b'x' * (api.MAX_UPLOAD_BYTES + 1),
+                                          content_type='image/jpeg')
+    assert response.status_code == 413
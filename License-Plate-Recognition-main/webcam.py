@@ -4,12 +4,12 @@ import torch
 import math
 import function.utils_rotate as utils_rotate
 import function.helper as helper
+import function.model_registry as model_registry
 import time
 
 # load model
-yolo_LP_detect = torch.hub.load('yolov5', 'custom', path='model/LP_detector_nano_61.pt', force_reload=True, source='local')
-yolo_license_plate = torch.hub.load('yolov5', 'custom', path='model/LP_ocr_nano_62.pt', force_reload=True, source='local')
-yolo_license_plate.conf = 0.60
+yolo_LP_detect = model_registry.get_model('model/LP_detector_nano_61.pt')
+yolo_license_plate = model_registry.get_model('model/LP_ocr_nano_62.pt', conf=0.60)
 
 prev_frame_time = 0
 new_frame_time = 0
@@ -22,8 +22,8 @@ while True:
         print("Không đọc được frame từ camera!")
         continue
 
-    plates = yolo_LP_detect(frame, size=640)
-    list_plates = plates.pandas().xyxy[0].values.tolist()
+    plates = yolo_LP_detect(frame, size=640, return_raw=True)
+    list_plates = plates.xyxy[0].tolist()
     list_read_plates = set()
 
     for plate in list_plates:
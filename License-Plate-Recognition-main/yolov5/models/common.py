@@ -13,20 +13,18 @@ from pathlib import Path
 
 import cv2
 import numpy as np
-import pandas as pd
-import requests
 import torch
 import torch.nn as nn
-import yaml
 from PIL import Image
 from torch.cuda import amp
 
-from utils.datasets import exif_transpose, letterbox
+from utils.augmentations import letterbox
 from utils.general import (LOGGER, check_requirements, check_suffix, check_version, colorstr, increment_path,
                            make_divisible, non_max_suppression, scale_coords, xywh2xyxy, xyxy2xywh)
-from utils.plots import Annotator, colors, save_one_box
 from utils.torch_utils import copy_attr, time_sync
 
+# Inference-only imports: pandas, requests, yaml, plotting and dataset utils are imported where they are used
+
 
 def autopad(k, p=None):  # kernel, padding
     # Pad to 'same'
@@ -291,7 +289,8 @@ class DetectMultiBackend(nn.Module):
         #   TensorFlow GraphDef:            *.pb
         #   TensorFlow Lite:                *.tflite
         #   TensorFlow Edge TPU:            *_edgetpu.tflite
-        from models.experimental import attempt_download, attempt_load  # scoped to avoid circular import
+        from models.experimental import attempt_load  # scoped to avoid circular import
+        from utils.downloads import attempt_download
 
         super().__init__()
         w = str(weights[0] if isinstance(weights, list) else weights)
@@ -300,6 +299,7 @@ class DetectMultiBackend(nn.Module):
         w = attempt_download(w)  # download if not local
         fp16 &= (pt or jit or onnx or engine) and device.type != 'cpu'  # FP16
         if data:  # data.yaml path (optional)
+            import yaml
             with open(data, errors='ignore') as f:
                 names = yaml.safe_load(f)['names']  # class names
 
@@ -520,7 +520,7 @@ class AutoShape(nn.Module):
         return self
 
     @torch.no_grad()
-    def forward(self, imgs, size=640, augment=False, profile=False):
+    def forward(self, imgs, size=640, augment=False, profile=False, return_raw=False):
         # Inference from various sources. For height=640, width=1280, RGB images example inputs are:
         #   file:       imgs = 'data/images/zidane.jpg'  # str or PosixPath
         #   URI:             = 'https://ultralytics.com/images/zidane.jpg'
@@ -529,6 +529,7 @@ class AutoShape(nn.Module):
         #   numpy:           = np.zeros((640,1280,3))  # HWC
         #   torch:           = torch.zeros(16,3,320,640)  # BCHW (scaled to size=640, 0-1 values)
         #   multiple:        = [Image.open('image1.jpg'), Image.open('image2.jpg'), ...]  # list of images
+        # return_raw=True returns RawDetections (numpy arrays, no pandas/plotting) instead of Detections
 
         t = [time_sync()]
         p = next(self.model.parameters()) if self.pt else torch.zeros(1, device=self.model.device)  # for device, type
@@ -543,9 +544,12 @@ class AutoShape(nn.Module):
         for i, im in enumerate(imgs):
             f = f'image{i}'  # filename
             if isinstance(im, (str, Path)):  # filename or uri
+                import requests
+                from utils.datasets import exif_transpose
                 im, f = Image.open(requests.get(im, stream=True).raw if str(im).startswith('http') else im), im
                 im = np.asarray(exif_transpose(im))
             elif isinstance(im, Image.Image):  # PIL Image
+                from utils.datasets import exif_transpose
                 im, f = np.asarray(exif_transpose(im)), getattr(im, 'filename', f) or f
             files.append(Path(f).with_suffix('.jpg').name)
             if im.shape[0] < 5:  # image in CHW
@@ -579,6 +583,8 @@ class AutoShape(nn.Module):
                 scale_coords(shape1, y[i][:, :4], shape0[i])
 
             t.append(time_sync())
+            if return_raw:
+                return RawDetections(y, shape0, t, self.names, x.shape)
             return Detections(imgs, y, files, t, self.names, x.shape)
 
 
@@ -586,22 +592,31 @@ class Detections:
     # YOLOv5 detections class for inference results
     def __init__(self, imgs, pred, files, times=(0, 0, 0, 0), names=None, shape=None):
         super().__init__()
-        d = pred[0].device  # device
-        gn = [torch.tensor([*(im.shape[i] for i in [1, 0, 1, 0]), 1, 1], device=d) for im in imgs]  # normalizations
         self.imgs = imgs  # list of images as numpy arrays
         self.pred = pred  # list of tensors pred[0] = (xyxy, conf, cls)
         self.names = names  # class names
         self.files = files  # image filenames
         self.times = times  # profiling times
         self.xyxy = pred  # xyxy pixels
-        self.xywh = [xyxy2xywh(x) for x in pred]  # xywh pixels
-        self.xyxyn = [x / g for x, g in zip(self.xyxy, gn)]  # xyxy normalized
-        self.xywhn = [x / g for x, g in zip(self.xywh, gn)]  # xywh normalized
         self.n = len(self.pred)  # number of images (batch size)
         self.t = tuple((times[i + 1] - times[i]) * 1000 / self.n for i in range(3))  # timestamps (ms)
         self.s = shape  # inference BCHW shape
 
+    def __getattr__(self, k):
+        # Derived box formats (xywh, xyxyn, xywhn) are computed on first access
+        if k not in ('xywh', 'xyxyn', 'xywhn') or 'pred' not in self.__dict__:
+            raise AttributeError(k)
+        if k == 'xywh':
+            v = [xyxy2xywh(x) for x in self.pred]  # xywh pixels
+        else:
+            d = self.pred[0].device  # device
+            gn = [torch.tensor([*(im.shape[i] for i in [1, 0, 1, 0]), 1, 1], device=d) for im in self.imgs]
+            v = [x / g for x, g in zip(self.xyxy if k == 'xyxyn' else self.xywh, gn)]  # normalized
+        setattr(self, k, v)
+        return v
+
     def display(self, pprint=False, show=False, save=False, crop=False, render=False, labels=True, save_dir=Path('')):
+        from utils.plots import Annotator, colors, save_one_box  # scoped to keep matplotlib out of inference imports
         crops = []
         for i, (im, pred) in enumerate(zip(self.imgs, self.pred)):
             s = f'image {i + 1}/{len(self.pred)}: {im.shape[0]}x{im.shape[1]} '  # string
@@ -665,6 +680,8 @@ class Detections:
 
     def pandas(self):
         # return detections as pandas DataFrames, i.e. print(results.pandas().xyxy[0])
+        import pandas as pd
+        pd.options.display.max_columns = 10
         new = copy(self)  # return copy
         ca = 'xmin', 'ymin', 'xmax', 'ymax', 'confidence', 'class', 'name'  # xyxy columns
         cb = 'xcenter', 'ycenter', 'width', 'height', 'confidence', 'class', 'name'  # xywh columns
@@ -690,6 +707,48 @@ class Detections:
         return ''
 
 
+class RawDetections:
+    # YOLOv5 lightweight detections class, numpy arrays only and derived box formats computed on first access
+    def __init__(self, pred, shapes, times=(0, 0, 0, 0), names=None, shape=None):
+        self.pred = [x.cpu().numpy() if isinstance(x, torch.Tensor) else x for x in pred]  # (n, 6) xyxy, conf, cls
+        self.shapes = shapes  # original image shapes (h, w)
+        self.names = names  # class names
+        self.times = times  # profiling times
+        self.xyxy = self.pred  # xyxy pixels
+        self.n = len(self.pred)  # number of images (batch size)
+        self.t = tuple((times[i + 1] - times[i]) * 1000 / self.n for i in range(3))  # timestamps (ms)
+        self.s = shape  # inference BCHW shape
+        self._xywh = self._xyxyn = self._xywhn = None
+
+    def _gn(self):
+        return [np.array([w, h, w, h, 1, 1], dtype=np.float32) for h, w in (s[:2] for s in self.shapes)]
+
+    @property
+    def xywh(self):
+        if self._xywh is None:
+            self._xywh = [xyxy2xywh(x) for x in self.xyxy]  # xywh pixels
+        return self._xywh
+
+    @property
+    def xyxyn(self):
+        if self._xyxyn is None:
+            self._xyxyn = [x / g for x, g in zip(self.xyxy, self._gn())]  # xyxy normalized
+        return self._xyxyn
+
+    @property
+    def xywhn(self):
+        if self._xywhn is None:
+            self._xywhn = [x / g for x, g in zip(self.xywh, self._gn())]  # xywh normalized
+        return self._xywhn
+
+    def tolist(self):
+        # return a list of RawDetections objects, one per image
+        return [RawDetections([self.pred[i]], [self.shapes[i]], self.times, self.names, self.s) for i in range(self.n)]
+
+    def __len__(self):
+        return self.n  # override len(results)
+
+
 class Classify(nn.Module):
     # Classification head, i.e. x(b,c1,20,20) to x(b,c2)
     def __init__(self, c1, c2, k=1, s=1, p=None, g=1):  # ch_in, ch_out, kernel, stride, padding, groups
@@ -0,0 +1,33 @@
+# YOLOv5 🚀 by Ultralytics, GPL-3.0 license
+"""
+Import budget for the inference path, see utils/import_budget.py
+
+Usage:
+    $ python -m pytest tests/test_import_budget.py  (also run by pytest from the project root)
+"""
+
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]  # YOLOv5 root directory
+if str(ROOT) not in sys.path:
+    sys.path.append(str(ROOT))
+
+from utils.import_budget import measure  # noqa: E402
+
+BUDGET = 0.5  # seconds for the inference imports on top of torch
+
+
+ATTEMPTS = 3  # best of, so one cold-cache run on a busy machine does not fail the suite
+
+
+def test_inference_imports_within_budget():
+    results = []
+    for _ in range(ATTEMPTS):
+        results.append(measure())
+        assert not results[-1]['loaded'], \
+            f"inference imports pulled in heavy modules: {', '.join(results[-1]['loaded'])}"
+        if results[-1]['time'] <= BUDGET:
+            break
+    best = min(result['time'] for result in results)
+    assert best <= BUDGET, f"inference imports took {best:.3f}s, budget {BUDGET:.3f}s"
@@ -27,14 +27,10 @@ from zipfile import ZipFile
 
 import cv2
 import numpy as np
-import pandas as pd
-import pkg_resources as pkg
 import torch
 import torchvision
-import yaml
 
-from utils.downloads import gsutil_getsize
-from utils.metrics import box_iou, fitness
+# pandas, pkg_resources, yaml, utils.downloads and utils.metrics are imported inside the functions that need them
 
 # Settings
 FILE = Path(__file__).resolve()
@@ -47,7 +43,6 @@ FONT = 'Arial.ttf'  # https://ultralytics.com/assets/Arial.ttf
 
 torch.set_printoptions(linewidth=320, precision=5, profile='long')
 np.set_printoptions(linewidth=320, formatter={'float_kind': '{:11.5g}'.format})  # format short g, %precision=5
-pd.options.display.max_columns = 10
 cv2.setNumThreads(0)  # prevent OpenCV from multithreading (incompatible with PyTorch DataLoader)
 os.environ['NUMEXPR_MAX_THREADS'] = str(NUM_THREADS)  # NumExpr max threads
 os.environ['OMP_NUM_THREADS'] = str(NUM_THREADS)  # OpenMP max threads (PyTorch and SciPy)
@@ -311,6 +306,7 @@ def check_python(minimum='3.7.0'):
 
 def check_version(current='0.0.0', minimum='0.0.0', name='version ', pinned=False, hard=False, verbose=False):
     # Check version vs. required version
+    import pkg_resources as pkg
     current, minimum = (pkg.parse_version(x) for x in (current, minimum))
     result = (current == minimum) if pinned else (current >= minimum)  # bool
     s = f'{name}{minimum} required by YOLOv5, but {name}{current} is currently installed'  # string
@@ -324,6 +320,7 @@ def check_version(current='0.0.0', minimum='0.0.0', name='version ', pinned=Fals
 @try_except
 def check_requirements(requirements=ROOT / 'requirements.txt', exclude=(), install=True, cmds=()):
     # Check installed dependencies meet requirements (pass *.txt file or list of packages)
+    import pkg_resources as pkg
     prefix = colorstr('red', 'bold', 'requirements:')
     check_python()  # check python version
     if isinstance(requirements, (str, Path)):  # requirements.txt file
@@ -449,6 +446,7 @@ def check_dataset(data, autodownload=True):
 
     # Read yaml (optional)
     if isinstance(data, (str, Path)):
+        import yaml
         with open(data, errors='ignore') as f:
             data = yaml.safe_load(f)  # dictionary
 
@@ -823,6 +821,7 @@ def non_max_suppression(prediction,
             i = i[:max_det]
         if merge and (1 < n < 3E3):  # Merge NMS (boxes merged using weighted mean)
             # update boxes as boxes(i,4) = weights(i,n) * boxes(n,4)
+            from utils.metrics import box_iou
             iou = box_iou(boxes[i], boxes) > iou_thres  # iou matrix
             weights = iou * scores[None]  # box weights
             x[i, :4] = torch.mm(weights, x[:, :4]).float() / weights.sum(1, keepdim=True)  # merged boxes
@@ -854,6 +853,12 @@ def strip_optimizer(f='best.pt', s=''):  # from utils.general import *; strip_op
 
 
 def print_mutation(results, hyp, save_dir, bucket, prefix=colorstr('evolve: ')):
+    import pandas as pd
+    import yaml
+
+    from utils.downloads import gsutil_getsize
+    from utils.metrics import fitness
+
     evolve_csv = save_dir / 'evolve.csv'
     evolve_yaml = save_dir / 'hyp_evolve.yaml'
     keys = ('metrics/precision', 'metrics/recall', 'metrics/mAP_0.5', 'metrics/mAP_0.5:0.95', 'val/box_loss',
@@ -0,0 +1,61 @@
+# YOLOv5 🚀 by Ultralytics, GPL-3.0 license
+"""
+Check that the inference path imports stay light (no plotting, dataset, download or logger dependencies)
+
+Imports torch first, then times importing the inference modules on top of it in a fresh interpreter.
+Exits non-zero if a heavy module is pulled in or the budget is exceeded.
+
+Usage:
+    $ python utils/import_budget.py --budget 0.5
+    $ python -m pytest tests/test_import_budget.py
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+FILE = Path(__file__).resolve()
+ROOT = FILE.parents[1]  # YOLOv5 root directory
+
+INFERENCE_MODULES = ('models.common', 'models.yolo', 'models.experimental', 'utils.general', 'utils.augmentations',
+                     'utils.torch_utils')
+HEAVY_MODULES = ('pandas', 'matplotlib', 'seaborn', 'scipy', 'requests', 'yaml', 'pkg_resources', 'utils.plots',
+                 'utils.datasets', 'utils.downloads', 'utils.loggers')
+
+PROBE = """
+import json, sys, time
+import torch, torchvision
+t = time.perf_counter()
+for m in {modules!r}:
+    __import__(m)
+print(json.dumps({{'time': time.perf_counter() - t, 'loaded': [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def measure():
+    # {'time': seconds to import the inference modules after torch, 'loaded': heavy modules pulled in}
+    code = PROBE.format(modules=INFERENCE_MODULES, heavy=HEAVY_MODULES)
+    out = subprocess.check_output([sys.executable, '-c', code], cwd=ROOT).decode().strip().splitlines()[-1]
+    return json.loads(out)
+
+
+def run(budget=0.5):
+    # Returns True if the inference imports are within budget
+    result = measure()
+    ok = result['time'] <= budget and not result['loaded']
+    print(f"inference imports: {result['time']:.3f}s (budget {budget:.3f}s), "
+          f"heavy modules loaded: {', '.join(result['loaded']) or 'none'} -> {'PASS' if ok else 'FAIL'}")
+    return ok
+
+
+def parse_opt():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--budget', type=float, default=0.5, help='max seconds for inference imports after torch')
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    opt = parse_opt()
+    sys.exit(0 if run(**vars(opt)) else 1)
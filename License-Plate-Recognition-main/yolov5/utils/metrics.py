@@ -7,7 +7,6 @@ import math
 import warnings
 from pathlib import Path
 
-import matplotlib.pyplot as plt
 import numpy as np
 import torch
 
@@ -173,6 +172,7 @@ class ConfusionMatrix:
 
     def plot(self, normalize=True, save_dir='', names=()):
         try:
+            import matplotlib.pyplot as plt
             import seaborn as sn
 
             array = self.matrix / ((self.matrix.sum(0).reshape(1, -1) + 1E-9) if normalize else 1)  # normalize columns
@@ -307,6 +307,7 @@ def wh_iou(wh1, wh2):
 
 
 def plot_pr_curve(px, py, ap, save_dir='pr_curve.png', names=()):
+    import matplotlib.pyplot as plt
     # Precision-recall curve
     fig, ax = plt.subplots(1, 1, figsize=(9, 6), tight_layout=True)
     py = np.stack(py, axis=1)
@@ -328,6 +329,7 @@ def plot_pr_curve(px, py, ap, save_dir='pr_curve.png', names=()):
 
 
 def plot_mc_curve(px, py, save_dir='mc_curve.png', names=(), xlabel='Confidence', ylabel='Metric'):
+    import matplotlib.pyplot as plt
     # Metric-confidence curve
     fig, ax = plt.subplots(1, 1, figsize=(9, 6), tight_layout=True)
 